@@ -7,14 +7,46 @@ from typing import Optional
 import sys
 import os
 import json
+import functools
+import queue
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import atexit
+import logging
+import logging.handlers
 from pathlib import Path
 
 # Add the src directory to the path to import agent and auth modules
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root / "src"))
 
+
+def configure_logging():
+    """
+    Configure application logging.
+    
+    Records are handed to a QueueHandler and written to stdout by a background
+    QueueListener, so request threads never block on the stdout pipe.
+    The level comes from LOG_LEVEL (default: INFO).
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    
+    root_logger = logging.getLogger()
+    root_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    listener.start()
+    atexit.register(listener.stop)
+
+
+configure_logging()
+
 try:
-    from agent.orchestrator import run_ka_dag, run_ka_dag_stream
+    from agent.orchestrator import arun_ka_dag, arun_ka_dag_stream, warmup
+    from agent.llm_orchestrator import get_llm_orchestrator
     from auth.auth import create_access_token, decode_access_token
     from auth.user_manager import UserManager
     from agent.db_setup import DatabaseSetup
@@ -51,6 +83,10 @@ security = HTTPBearer(auto_error=False)
 # Initialize user manager (handles all user operations with the 'users' table)
 user_manager = UserManager()
 
+# bcrypt hashing/verification (~250ms of CPU at cost 12, GIL released) runs here,
+# so logins and registrations neither block the event loop nor starve asyncio.to_thread
+password_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="bcrypt")
+
 # Initialize database setup
 db_setup = DatabaseSetup()
 
@@ -106,6 +142,11 @@ async def startup_event():
         else:
             print("✓ Database setup complete - No active connection yet")
         
+        # Load models and open connections before the first request arrives
+        print("🔥 Warming up query pipeline...")
+        await asyncio.to_thread(warmup)
+        print("✓ Query pipeline warmed up")
+        
         # Print registered routes for debugging
         print(f"✓ Registered {len(app.routes)} routes")
         for route in app.routes:
@@ -123,6 +164,16 @@ async def startup_event():
         # The app can still function with local database even if RDS setup fails
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled OpenAI connections and the password hashing pool on shutdown."""
+    # Same process-wide instance the DAG uses; creating it here does not open clients
+    llm_orchestrator = get_llm_orchestrator()
+    llm_orchestrator.close()
+    await llm_orchestrator.aclose()
+    password_executor.shutdown(wait=False)
+
+
 # Authentication Models
 class RegisterRequest(BaseModel):
     """Request model for user registration."""
@@ -269,7 +320,7 @@ async def get_current_user(
         # Get user from the 'users' table by ID
         print(f"DEBUG: Attempting to get user by ID: {user_id}")
         try:
-            user = user_manager.get_user_by_id(user_id)
+            user = await asyncio.to_thread(user_manager.get_user_by_id, user_id)
             print(f"DEBUG: get_user_by_id returned: {user}")
         except Exception as e:
             print(f"DEBUG: Exception in get_user_by_id: {type(e).__name__}: {str(e)}")
@@ -398,10 +449,14 @@ async def register(request: RegisterRequest):
     try:
         # Register user in the 'users' table (password is automatically hashed)
         print("DEBUG: Calling user_manager.register_user...")
-        user = user_manager.register_user(
-            email=request.email,
-            password=request.password,
-            full_name=request.full_name
+        user = await asyncio.get_running_loop().run_in_executor(
+            password_executor,
+            functools.partial(
+                user_manager.register_user,
+                email=request.email,
+                password=request.password,
+                full_name=request.full_name
+            )
         )
         print(f"DEBUG: User registered successfully with ID: {user.get('id')}")
         
@@ -450,7 +505,10 @@ async def login(request: LoginRequest):
     Returns a JWT access token upon successful authentication.
     """
     # Authenticate user from the 'users' table
-    user = user_manager.authenticate_user(request.email, request.password)
+    # bcrypt verification is CPU-bound; run it off the event loop
+    user = await asyncio.get_running_loop().run_in_executor(
+        password_executor, user_manager.authenticate_user, request.email, request.password
+    )
     
     if not user:
         raise HTTPException(
@@ -493,9 +551,9 @@ async def get_token_info(
             return {"error": "No token provided"}
         
         # Decode without verification to get expiration info
-        from jose import jwt as jose_jwt
+        import jwt
         from datetime import datetime
-        unverified = jose_jwt.decode(token, options={"verify_signature": False})
+        unverified = jwt.decode(token, options={"verify_signature": False})
         
         exp_timestamp = unverified.get("exp")
         if exp_timestamp:
@@ -544,8 +602,8 @@ async def query_knowledge_assistant(
         # Get user_id from authenticated user
         user_id = current_user["id"]
         
-        # Run the orchestrator DAG
-        result = run_ka_dag(
+        # Run the orchestrator DAG without blocking the event loop
+        result = await arun_ka_dag(
             query=request.query,
             user_id=user_id
         )
@@ -607,10 +665,10 @@ async def query_knowledge_assistant_stream(
         # Get user_id from authenticated user
         user_id = current_user["id"]
         
-        def generate_stream():
-            """Generator function that yields SSE-formatted data."""
+        async def generate_stream():
+            """Async generator that yields SSE-formatted data."""
             try:
-                for chunk in run_ka_dag_stream(
+                async for chunk in arun_ka_dag_stream(
                     query=request.query,
                     user_id=user_id
                 ):
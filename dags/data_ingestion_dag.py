@@ -98,6 +98,7 @@ def data_ingestion_pipeline():
         # Get extraction configuration from config file
         enable_post_processing = CONFIG.get("extraction", {}).get("enable_post_processing", True)
         verbose = CONFIG.get("extraction", {}).get("verbose", True)
+        partition_workers = CONFIG.get("extraction", {}).get("partition_workers", 1)
         
         # Initialize extractor with post-processing enabled
         extractor = Extractor(enable_post_processing=enable_post_processing, verbose=verbose)
@@ -108,7 +109,9 @@ def data_ingestion_pipeline():
             print(f"\nExtracting from: {pdf_file.name}")
             try:
                 # Extract text from PDF
-                extracted_texts = extractor.extract(str(pdf_file), preserve_structure=True)
+                extracted_texts = extractor.extract(
+                    str(pdf_file), preserve_structure=True, partition_workers=partition_workers
+                )
                 
                 # Store extraction results
                 extraction_results[pdf_file.name] = {
@@ -279,12 +282,14 @@ def data_ingestion_pipeline():
         """
         import json
         import uuid
+        import numpy as np
         
         src_path = Path("/opt/airflow/src") if Path("/opt/airflow/src").exists() else Path(__file__).parent.parent / "src"
         sys.path.insert(0, str(src_path))
         
         from agent.query_processing import QueryProcessor
         from agent.context_retriever import ContextRetriever
+        from knowledge.embedding_cache import EmbeddingCache
         
         chunked_dir = Path(chunked_dir_path)
         if not chunked_dir.exists():
@@ -310,6 +315,11 @@ def data_ingestion_pipeline():
         
         # Get embedding batch size from config file
         batch_size = CONFIG.get("embeddings", {}).get("batch_size", 100)
+        vector_decimals = CONFIG.get("embeddings", {}).get("vector_decimals", 5)
+        
+        # Reuse embeddings of chunks that were already embedded in an earlier run
+        cache_path = CONFIG.get("embeddings", {}).get("cache_path")
+        embedding_cache = EmbeddingCache(cache_path, context_retriever.model_id) if cache_path else None
         
         print(f"Converting chunks to embeddings (batch_size={batch_size})...")
         
@@ -346,10 +356,7 @@ def data_ingestion_pipeline():
             try:
                 # Step 1: Process chunks using QueryProcessor
                 print(f"  Processing {len(chunks)} chunks...")
-                processed_chunks = []
-                for chunk in chunks:
-                    processed_chunk = query_processor.process(chunk)
-                    processed_chunks.append(processed_chunk)
+                processed_chunks = query_processor.process_batch(chunks)
                 
                 # Step 2: Convert to embeddings in batches
                 print(f"  Converting to embeddings...")
@@ -363,30 +370,31 @@ def data_ingestion_pipeline():
                     batch_original = chunks[start_idx:end_idx]  # Keep original for storage
                     
                     # Convert batch to embeddings
-                    batch_embeddings = context_retriever.convert_batch_to_embeddings(batch_chunks)
+                    if embedding_cache is not None:
+                        batch_embeddings = embedding_cache.embed(batch_chunks, context_retriever.convert_batch_to_embeddings)
+                    else:
+                        batch_embeddings = context_retriever.convert_batch_to_embeddings(batch_chunks)
                     
                     # Ensure embeddings is a 2D numpy array
                     if batch_embeddings.ndim == 1:
                         batch_embeddings = batch_embeddings.reshape(1, -1)
                     
-                    # Store embeddings with metadata
-                    for i in range(len(batch_chunks)):
-                        # Get embedding for this chunk
-                        if batch_embeddings.ndim == 2:
-                            embedding = batch_embeddings[i]
-                        else:
-                            embedding = batch_embeddings
-                        
-                        # Generate unique ID for each vector
-                        vector_id = str(uuid.uuid4())
-                        
-                        pdf_embeddings.append({
-                            "id": vector_id,
+                    # Convert the whole batch to nested lists in one call (one row per chunk),
+                    # rounded in float64 so the values serialize as short decimals
+                    embedding_lists = np.round(batch_embeddings.astype(np.float64), vector_decimals).tolist()
+                    
+                    # Store embeddings with metadata (one unique ID per vector)
+                    pdf_embeddings.extend(
+                        {
+                            "id": uuid.uuid4().hex,
                             "chunk_index": start_idx + i,
-                            "embedding": embedding.tolist(),  # Convert numpy array to list
-                            "original_text": batch_original[i],
-                            "processed_text": batch_chunks[i]
-                        })
+                            "embedding": embedding,
+                            "original_text": original_text,
+                            "processed_text": processed_text
+                        }
+                        for i, (embedding, original_text, processed_text)
+                        in enumerate(zip(embedding_lists, batch_original, batch_chunks))
+                    )
                     
                     if (batch_idx + 1) % 10 == 0 or (batch_idx + 1) == num_batches:
                         print(f"    Processed batch {batch_idx + 1}/{num_batches}")
@@ -413,6 +421,9 @@ def data_ingestion_pipeline():
                     "error": str(e)
                 }
         
+        if embedding_cache is not None:
+            embedding_cache.close()
+        
         # Save embeddings results to JSON file
         output_file = embeddings_dir / "embeddings_data.json"
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -550,27 +561,19 @@ def data_ingestion_pipeline():
                     batch_embeddings = embeddings[start_idx:end_idx]
                     
                     # Prepare vectors in Pinecone format
-                    vectors_to_upload = []
-                    for emb_data in batch_embeddings:
-                        vector_id = emb_data.get('id')
-                        embedding_values = emb_data.get('embedding')
-                        chunk_index = emb_data.get('chunk_index', 0)
-                        original_text = emb_data.get('original_text', '')
-                        processed_text = emb_data.get('processed_text', '')
-                        
-                        # Prepare metadata
-                        metadata = {
-                            "pdf_name": pdf_name,
-                            "chunk_index": chunk_index,
-                            "text": original_text,  # Store original text for retrieval
-                            "processed_text": processed_text  # Store processed text for reference
+                    vectors_to_upload = [
+                        {
+                            "id": emb_data.get('id'),
+                            "values": emb_data.get('embedding'),  # Already a list from embeddings_data.json
+                            "metadata": {
+                                "pdf_name": pdf_name,
+                                "chunk_index": emb_data.get('chunk_index', 0),
+                                "text": emb_data.get('original_text', ''),  # Store original text for retrieval
+                                "processed_text": emb_data.get('processed_text', '')  # Store processed text for reference
+                            }
                         }
-                        
-                        vectors_to_upload.append({
-                            "id": vector_id,
-                            "values": embedding_values,  # Already a list from embeddings_data.json
-                            "metadata": metadata
-                        })
+                        for emb_data in batch_embeddings
+                    ]
                     
                     # Upsert batch to Pinecone
                     print(f"  Uploading batch {batch_idx + 1}/{num_batches} ({len(vectors_to_upload)} vectors)...")
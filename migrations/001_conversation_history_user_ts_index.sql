@@ -0,0 +1,9 @@
+-- Composite index for MemoryRetriever.get_past_conversations:
+-- lets "WHERE user_id = ? ORDER BY timestamp DESC LIMIT 3" read the newest rows
+-- for a user straight from the index instead of sorting all of that user's history.
+--
+-- CONCURRENTLY avoids blocking writes while the index builds; run it outside a
+-- transaction block (psql's default autocommit mode), e.g.:
+--   psql "$DATABASE_URL" -f migrations/001_conversation_history_user_ts_index.sql
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_conv_hist_user_ts
+    ON conversation_history (user_id, timestamp DESC);
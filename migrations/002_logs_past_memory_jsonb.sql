@@ -0,0 +1,4 @@
+-- Store logs.past_memory as JSONB. Logger now sends the value through
+-- psycopg2.extras.Json, so existing text rows are converted to JSON strings.
+ALTER TABLE logs
+    ALTER COLUMN past_memory TYPE JSONB USING to_jsonb(past_memory);
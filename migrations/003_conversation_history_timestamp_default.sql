@@ -0,0 +1,4 @@
+-- Let the database stamp conversation_history rows. Logger no longer sends
+-- a client-side datetime.now() for the timestamp column.
+ALTER TABLE conversation_history
+    ALTER COLUMN timestamp SET DEFAULT CURRENT_TIMESTAMP;
@@ -1,10 +1,19 @@
 from typing import List
 import os
+import threading
 import numpy as np
+from cachetools import TTLCache
 from FlagEmbedding import FlagModel
 from pinecone import Pinecone
 from pathlib import Path
-from .utils import load_config
+from .utils import cached_load_config
+from .embedding_batcher import EmbeddingBatcher
+
+# Retrieved contexts are cached per (processed query, top_k). Popular queries
+# skip the embedding and Pinecone round-trip; the TTL bounds how long newly
+# ingested documents can be missed by a cached query.
+CONTEXT_CACHE_MAXSIZE = 2048
+CONTEXT_CACHE_TTL_SECONDS = 600
 
 
 class ContextRetriever:
@@ -19,6 +28,11 @@ class ContextRetriever:
         Pinecone index initialization may fail if not configured - this is handled gracefully.
         """
         self.model = self._initialize_embedding_model()
+        self._context_cache = TTLCache(maxsize=CONTEXT_CACHE_MAXSIZE, ttl=CONTEXT_CACHE_TTL_SECONDS)
+        self._context_cache_lock = threading.Lock()
+        # Query-time embeddings go through a batcher, started on first use
+        self._batcher = None
+        self._batcher_lock = threading.Lock()
         try:
             self._pinecone_index = self._initialize_pinecone_index()
         except Exception as e:
@@ -35,13 +49,27 @@ class ContextRetriever:
         # Load configuration
         project_root = Path(__file__).parent.parent.parent
         config_path = project_root / "configs" / "backend_config.yaml"
-        config = load_config(config_path)
+        config = cached_load_config(config_path)
         
         # Get model name from config
-        model_name = config.get("embeddings_model", {}).get("name", "BAAI/bge-m3")
+        embeddings_config = config.get("embeddings_model", {})
+        model_name = embeddings_config.get("name", "BAAI/bge-m3")
+        
+        # Use the exported (e.g. INT8-quantized) ONNX model when one is configured
+        onnx_path = embeddings_config.get("onnx_path")
+        if onnx_path:
+            try:
+                from .onnx_embedder import OnnxEmbedder
+                model = OnnxEmbedder(onnx_path, tokenizer_name=model_name)
+                # Identifies the model the embeddings come from (e.g. for embedding caches)
+                self.model_id = f"{model_name}@{onnx_path}"
+                return model
+            except Exception as e:
+                print(f"WARNING: ONNX embedding model not loaded, falling back to FlagModel: {str(e)}")
         
         # Initialize FlagModel with the configured name
         model = FlagModel(model_name, use_fp16=True)
+        self.model_id = model_name
         return model
     
     def convert_to_embeddings(self, processed_query: str) -> np.ndarray:
@@ -63,6 +91,23 @@ class ContextRetriever:
         
         return embeddings
     
+    def embed_query(self, processed_query: str) -> np.ndarray:
+        """
+        Convert a query to vector embeddings, batching the model call with
+        concurrent queries from other request threads.
+        
+        Args:
+            processed_query: The processed query string to convert to embeddings
+            
+        Returns:
+            numpy array containing the vector embeddings
+        """
+        if self._batcher is None:
+            with self._batcher_lock:
+                if self._batcher is None:
+                    self._batcher = EmbeddingBatcher(self.convert_batch_to_embeddings)
+        return self._batcher.embed(processed_query)
+    
     def convert_batch_to_embeddings(self, processed_queries: List[str]) -> np.ndarray:
         """
         Convert a batch of processed queries to vector embeddings.
@@ -130,9 +175,15 @@ class ContextRetriever:
         Raises:
             Exception: If Pinecone index is not available or query fails
         """
+        cache_key = (query, top_k)
+        with self._context_cache_lock:
+            cached = self._context_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
         try:
             # Step 1: Convert query to embeddings
-            query_embedding = self.convert_to_embeddings(query)
+            query_embedding = self.embed_query(query)
             
             # Step 2: Get Pinecone index (should be initialized in __init__)
             if self._pinecone_index is None:
@@ -155,6 +206,11 @@ class ContextRetriever:
                 if text:  # Only add non-empty contexts
                     contexts.append(text)
             
+            # Empty results are not cached, so a query that missed is retried
+            if contexts:
+                with self._context_cache_lock:
+                    self._context_cache[cache_key] = tuple(contexts)
+            
             return contexts
             
         except Exception as e:
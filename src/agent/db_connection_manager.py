@@ -2,12 +2,53 @@
 Database connection manager with automatic failover between RDS and local PostgreSQL.
 """
 import os
+import re
+import atexit
 import psycopg2
 import time
+from contextlib import contextmanager
+from psycopg2 import pool
 from typing import Optional, Tuple
 from threading import Lock
 
 
+class PreparingConnection(psycopg2.extensions.connection):
+    """
+    psycopg2 connection that remembers which named statements have been
+    prepared on it, so each is prepared once per physical connection.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+
+def execute_prepared(cursor, name: str, sql: str, params: tuple) -> None:
+    """
+    Execute a named server-side prepared statement, preparing it on first use
+    on the cursor's connection.
+    
+    Args:
+        cursor: Cursor of a pooled connection
+        name: Statement name (must be unique per SQL text)
+        sql: Statement text using $1, $2, ... placeholders, in order
+        params: Parameter values
+    """
+    prepared = getattr(cursor.connection, "prepared_statements", None)
+    if prepared is None:
+        # Not a pooled connection: run the statement directly
+        cursor.execute(re.sub(r"\$\d+", "%s", sql.replace("%", "%%")), params)
+        return
+    
+    if name not in prepared:
+        # PREPARE is session-level and not undone by a transaction rollback
+        cursor.execute(f"PREPARE {name} AS {sql}")
+        prepared.add(name)
+    
+    placeholders = ", ".join(["%s"] * len(params))
+    cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+
+
 class DatabaseConnectionManager:
     """
     Manages database connections with automatic failover from RDS to local PostgreSQL.
@@ -24,6 +65,13 @@ class DatabaseConnectionManager:
         self._rds_check_interval = 60  # Check RDS every 60 seconds for recovery
         self._lock = Lock()
         
+        # Connection pool for concurrent request paths (see connection())
+        self._pool = None
+        self._pool_db_type = None
+        self._pool_probing = False  # True while a thread re-runs failover for the pool
+        self._pool_min = int(os.getenv("DB_POOL_MIN", "2"))
+        self._pool_max = int(os.getenv("DB_POOL_MAX", "32"))
+        
         # RDS connection parameters
         self._rds_host = os.getenv("DB_HOST")
         self._rds_port = os.getenv("DB_PORT", "5432")
@@ -77,6 +125,147 @@ class DatabaseConnectionManager:
             self._current_db_type = db_type
             return connection
     
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection from the pool for the duration of a with-block.
+        
+        The pool is created lazily against whichever database is reachable
+        (RDS first, then local standby). Connections are returned to the pool
+        on exit. A connection that fails with a connection-level error is
+        closed instead of returned; the pool itself is only dropped when it can
+        no longer open connections, so the next borrow re-runs failover.
+        
+        Yields:
+            psycopg2 connection object
+        """
+        db_pool = self._get_pool()
+        try:
+            conn = db_pool.getconn()
+        except psycopg2.OperationalError:
+            # The pool's database is unreachable
+            self._discard_pool(db_pool)
+            raise
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.extensions.QueryCanceledError, psycopg2.extensions.TransactionRollbackError):
+            # Statement timeouts and deadlocks leave the connection usable
+            raise
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            discard = broken or conn.closed or db_pool is not self._pool
+            if not discard and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                # Never hand a connection with an open transaction to the next caller
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    discard = True
+            try:
+                db_pool.putconn(conn, close=discard)
+            except pool.PoolError:
+                # Pool was closed while the connection was borrowed
+                conn.close()
+    
+    def _get_pool(self) -> pool.ThreadedConnectionPool:
+        """
+        Get the connection pool, (re)building it when missing or when it is
+        time to check whether RDS has recovered from a failover to local.
+        
+        Returns:
+            psycopg2 ThreadedConnectionPool instance
+        """
+        with self._lock:
+            if self._pool is not None and not self._pool.closed:
+                rds_recheck_due = (
+                    self._pool_db_type == 'local' and
+                    (time.time() - self._last_rds_check) > self._rds_check_interval
+                )
+                # While one thread re-checks RDS the others keep using the current pool
+                if not rds_recheck_due or self._pool_probing:
+                    return self._pool
+            self._pool_probing = True
+        
+        # Probe and open the new pool without holding the lock: the RDS probe can
+        # take its full connect timeout before falling back to local
+        try:
+            probe_conn, db_type = self._get_working_connection()
+            probe_conn.close()
+            with self._lock:
+                self._current_db_type = db_type
+                if self._pool is not None and not self._pool.closed and db_type == self._pool_db_type:
+                    return self._pool
+            params = self._connection_params(db_type)
+            new_pool = pool.ThreadedConnectionPool(self._pool_min, self._pool_max, **params)
+        finally:
+            with self._lock:
+                self._pool_probing = False
+        
+        with self._lock:
+            if self._pool is not None and not self._pool.closed and db_type == self._pool_db_type:
+                # Another thread swapped in an equivalent pool meanwhile
+                new_pool.closeall()
+                return self._pool
+            # The replaced pool is not closed here because other threads may still
+            # hold its connections; those are closed when returned (see connection())
+            # and its idle connections are released along with the pool object.
+            self._pool = new_pool
+            self._pool_db_type = db_type
+            return self._pool
+    
+    def _discard_pool(self, db_pool: pool.ThreadedConnectionPool):
+        """
+        Drop a pool whose connections are no longer usable.
+        
+        Args:
+            db_pool: The pool the failing connection was borrowed from
+        """
+        with self._lock:
+            if self._pool is db_pool:
+                self._pool = None
+                self._pool_db_type = None
+                self._current_db_type = None
+    
+    def _connection_params(self, db_type: str) -> dict:
+        """
+        Get psycopg2 connection parameters for the given database type.
+        
+        Args:
+            db_type: 'rds' or 'local'
+            
+        Returns:
+            Dictionary of connection keyword arguments
+        """
+        if db_type == 'rds':
+            return {
+                "host": self._rds_host,
+                "port": self._rds_port,
+                "database": self._rds_name,
+                "user": self._rds_user,
+                "password": self._rds_password,
+                "connect_timeout": 3,
+                "connection_factory": PreparingConnection,
+            }
+        return {
+            "host": self._standby_host,
+            "port": self._standby_port,
+            "database": self._standby_name,
+            "user": self._standby_user,
+            "password": self._standby_password,
+            "connect_timeout": 5,
+            "connection_factory": PreparingConnection,
+        }
+    
+    def close_pool(self):
+        """Close all pooled connections."""
+        with self._lock:
+            if self._pool is not None and not self._pool.closed:
+                self._pool.closeall()
+            self._pool = None
+            self._pool_db_type = None
+    
     def _get_working_connection(self) -> Tuple[psycopg2.extensions.connection, str]:
         """
         Get a working connection, trying RDS first, then local.
@@ -148,7 +337,7 @@ class DatabaseConnectionManager:
         Returns:
             Tuple of (is_available, error_message) where error_message is None on success
         """
-        if not all([self._rds_host, self._rds_name, self._rds_user, self._rds_password]):
+        if not self.is_rds_configured():
             return False, "Missing RDS connection parameters (DB_HOST, DB_NAME, DB_USER, or DB_PASSWORD)"
         
         try:
@@ -185,14 +374,19 @@ class DatabaseConnectionManager:
         conn, _ = self._create_rds_connection_with_error()
         return conn
     
-    def _create_rds_connection_with_error(self) -> Tuple[Optional[psycopg2.extensions.connection], Optional[str]]:
+    def _create_rds_connection_with_error(
+        self, connect_timeout: Optional[int] = None
+    ) -> Tuple[Optional[psycopg2.extensions.connection], Optional[str]]:
         """
         Create a connection to RDS and return error details.
         
+        Args:
+            connect_timeout: Optional connection timeout in seconds
+        
         Returns:
             Tuple of (connection, error_message) where error_message is None on success
         """
-        if not all([self._rds_host, self._rds_name, self._rds_user, self._rds_password]):
+        if not self.is_rds_configured():
             return None, "Missing RDS connection parameters (DB_HOST, DB_NAME, DB_USER, or DB_PASSWORD)"
         
         try:
@@ -201,7 +395,8 @@ class DatabaseConnectionManager:
                 port=self._rds_port,
                 database=self._rds_name,
                 user=self._rds_user,
-                password=self._rds_password
+                password=self._rds_password,
+                connect_timeout=connect_timeout
             )
             conn.autocommit = False
             return conn, None
@@ -309,6 +504,28 @@ class DatabaseConnectionManager:
                 self._connection = None
                 self._current_db_type = None
     
+    def is_rds_configured(self) -> bool:
+        """
+        Check whether the RDS connection parameters are set.
+        
+        Returns:
+            True if DB_HOST, DB_NAME, DB_USER and DB_PASSWORD are all set
+        """
+        return all([self._rds_host, self._rds_name, self._rds_user, self._rds_password])
+    
+    def get_rds_connection(self):
+        """
+        Get a dedicated connection specifically to the RDS database.
+        Useful for schema initialization.
+        
+        Returns:
+            psycopg2 connection object to RDS
+        """
+        conn, error = self._create_rds_connection_with_error(connect_timeout=3)
+        if not conn:
+            raise Exception(f"Failed to connect to RDS database: {error}")
+        return conn
+    
     def get_standby_connection(self):
         """
         Get a connection specifically to the standby (local) database.
@@ -337,5 +554,6 @@ def get_connection_manager() -> DatabaseConnectionManager:
     global _connection_manager
     if _connection_manager is None:
         _connection_manager = DatabaseConnectionManager()
+        atexit.register(_connection_manager.close_pool)
     return _connection_manager
 
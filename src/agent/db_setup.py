@@ -1,18 +1,24 @@
 """
 Database setup module for creating all required tables.
 """
-import os
 import psycopg2
 from typing import Optional
-from .db_connection_manager import get_connection_manager
+from .db_connection_manager import DatabaseConnectionManager, get_connection_manager
 
 
 class DatabaseSetup:
     """Handles creation of all database tables required by the application."""
     
-    def __init__(self):
-        """Initialize the DatabaseSetup with database connection manager."""
-        self._connection_manager = get_connection_manager()
+    def __init__(self, connection_manager: Optional[DatabaseConnectionManager] = None):
+        """
+        Initialize the DatabaseSetup with database connection manager.
+        
+        Args:
+            connection_manager: Connection manager to use. Defaults to the shared
+                                process-wide instance so setup reuses the same
+                                connection (and failover state) as the rest of the app.
+        """
+        self._connection_manager = connection_manager or get_connection_manager()
     
     def _get_db_connection(self):
         """Get a database connection using the connection manager (with failover)."""
@@ -79,12 +85,19 @@ class DatabaseSetup:
             CREATE TABLE IF NOT EXISTS conversation_history (
                 id SERIAL PRIMARY KEY,
                 user_id INTEGER NOT NULL,
-                timestamp TIMESTAMP NOT NULL,
+                timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
                 user_query TEXT NOT NULL,
                 llm_response TEXT NOT NULL
             );
             """
             cursor.execute(create_conversation_history_table)
+            
+            # Index for memory retrieval (latest rows per user); existing large
+            # tables should get it from migrations/001 (CREATE INDEX CONCURRENTLY)
+            cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_conv_hist_user_ts
+                ON conversation_history (user_id, timestamp DESC);
+            """)
             if conv_exists:
                 print(f"✓ [{db_type.upper()}] Conversation_history table already exists (verified)")
             else:
@@ -100,7 +113,7 @@ class DatabaseSetup:
                 query TEXT,
                 processed_query TEXT,
                 context TEXT,
-                past_memory TEXT,
+                past_memory JSONB,
                 llm_response TEXT
             );
             """
@@ -154,46 +167,39 @@ class DatabaseSetup:
         Existing tables and data will not be affected.
         """
         # Create tables on the active database (via connection manager)
+        active_db_type = None
         try:
             conn = self._get_db_connection()
-            db_type = self._connection_manager.get_current_db_type() or 'unknown'
-            self._create_tables_on_connection(conn, db_type)
+            active_db_type = self._connection_manager.get_current_db_type()
+            self._create_tables_on_connection(conn, active_db_type or 'unknown')
         except Exception as e:
             print(f"⚠ Warning: Failed to create tables on active database: {e}")
         
-        # Also create tables on local standby database (always ensure it's set up)
-        try:
-            standby_conn = self._connection_manager.get_standby_connection()
-            self._create_tables_on_connection(standby_conn, 'local')
-            standby_conn.close()
-        except Exception as e:
-            print(f"⚠ Warning: Failed to create tables on local standby database: {e}")
+        # Also create tables on local standby database (always ensure it's set up).
+        # Skipped when the standby is the active database - it was handled above.
+        if active_db_type != 'local':
+            try:
+                standby_conn = self._connection_manager.get_standby_connection()
+                try:
+                    self._create_tables_on_connection(standby_conn, 'local')
+                finally:
+                    standby_conn.close()
+            except Exception as e:
+                print(f"⚠ Warning: Failed to create tables on local standby database: {e}")
         
         # Try to create tables on RDS if available (for schema sync)
-        # This ensures both databases have the same schema
-        try:
-            import os
-            import psycopg2
-            db_host = os.getenv("DB_HOST")
-            db_port = os.getenv("DB_PORT", "5432")
-            db_name = os.getenv("DB_NAME")
-            db_user = os.getenv("DB_USER")
-            db_password = os.getenv("DB_PASSWORD")
-            
-            if all([db_host, db_name, db_user, db_password]):
-                rds_conn = psycopg2.connect(
-                    host=db_host,
-                    port=db_port,
-                    database=db_name,
-                    user=db_user,
-                    password=db_password,
-                    connect_timeout=3
-                )
-                rds_conn.autocommit = False
-                self._create_tables_on_connection(rds_conn, 'rds')
-                rds_conn.close()
-        except Exception as e:
-            print(f"⚠ Warning: Failed to create tables on RDS (may be unavailable): {e}")
+        # This ensures both databases have the same schema.
+        # Skipped when RDS is the active database - it was handled above - and, silently,
+        # when no RDS is configured (local-only deployments).
+        if active_db_type != 'rds' and self._connection_manager.is_rds_configured():
+            try:
+                rds_conn = self._connection_manager.get_rds_connection()
+                try:
+                    self._create_tables_on_connection(rds_conn, 'rds')
+                finally:
+                    rds_conn.close()
+            except Exception as e:
+                print(f"⚠ Warning: Failed to create tables on RDS (may be unavailable): {e}")
     
     def get_active_db_type(self) -> Optional[str]:
         """
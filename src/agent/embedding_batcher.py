@@ -0,0 +1,80 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, List
+import numpy as np
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent single-query embedding requests into batched model calls.
+
+    Callers on any thread submit one text and block on its result. A daemon worker
+    waits for the first request, collects more for up to max_wait_ms (or until
+    max_batch is reached), embeds them with one call, and resolves each caller's
+    future with its row. Under load this amortizes the model's per-call overhead;
+    a lone request only pays the short wait.
+    """
+
+    def __init__(
+        self,
+        embed_batch_fn: Callable[[List[str]], np.ndarray],
+        max_batch: int = 32,
+        max_wait_ms: float = 5
+    ):
+        """
+        Initialize the EmbeddingBatcher and start its background worker.
+
+        Args:
+            embed_batch_fn: Function mapping a list of texts to a 2-D array of embeddings
+            max_batch: Maximum number of texts embedded per call
+            max_wait_ms: How long to wait for more requests after the first one arrives
+        """
+        self._embed_batch_fn = embed_batch_fn
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000
+        self._q = queue.Queue()
+        self._t = threading.Thread(target=self._drain, name="embedding-batcher", daemon=True)
+        self._t.start()
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed one text, batched together with any concurrent requests.
+
+        Args:
+            text: The text to embed
+
+        Returns:
+            1-D numpy array containing the embedding
+
+        Raises:
+            Exception: Whatever the batch embedding function raised for this batch
+        """
+        future = Future()
+        self._q.put((text, future))
+        return future.result()
+
+    def _drain(self) -> None:
+        """
+        Worker loop: wait for a request, collect a batch, embed it, and resolve the futures.
+        """
+        while True:
+            batch = [self._q.get()]
+            deadline = time.monotonic() + self._max_wait
+            try:
+                while len(batch) < self._max_batch:
+                    batch.append(self._q.get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                pass
+
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = np.asarray(self._embed_batch_fn(texts))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for row, (_, future) in zip(embeddings, batch):
+                future.set_result(row)
@@ -1,30 +1,43 @@
-import dspy
+import json
+import asyncio
+import threading
 from dotenv import load_dotenv
-from dspy import Signature, InputField, OutputField
-from dspy import LM
 from pathlib import Path
-from .utils import load_config
+from typing import List
+from .utils import cached_load_config
+from .openai_client import get_openai_client, create_async_openai_client, openai_model_name
 
 # Load environment variables from .env file
 load_dotenv()
 
 
-class TaskClassificationSignature(Signature):
-    """
-    Signature for task classification with two boolean outputs.
-    rag is required if the query is related to internal documents, or any domain specific information, which might not be publicly available.
-    previous memory is required , if the query is related to the previous conversation.
+# Instructions for task classification with two boolean outputs, returned as a JSON object.
+CLASSIFICATION_PROMPT = (
+    "Classify the user's query with two boolean outputs.\n"
+    "rag is required if the query is related to internal documents, or any domain specific information, "
+    "which might not be publicly available.\n"
+    "previous memory is required, if the query is related to the previous conversation.\n\n"
+    "Respond only with a JSON object of the form "
+    '{"is_rag_required": true or false, "is_prev_memory_required": true or false}.\n'
+    "is_rag_required: is rag search required for the query. If the query is domain specific, then it is required.\n"
+    "is_prev_memory_required: is previous memory required for the query. "
+    "If the query is about the previous conversation, then it is required."
+)
 
-    Input:
-        query: a processed query string
 
-    Output:
-        is_rag_required: is rag search required for the query (True or False). If the query is domain specific, then it is required.
-        is_prev_memory_required: is previous memory required for the query (True or False). If the query is about the previous conversation, then it is required.
+def _to_bool(value) -> bool:
+    """
+    Interpret a JSON value from the model as a boolean.
+    
+    Args:
+        value: A JSON boolean, or a string such as "true"/"false"
+        
+    Returns:
+        The boolean value
     """
-    query: str = InputField(desc="A processed query string to be classified")
-    is_rag_required: bool = OutputField(desc="Is RAG search required for the query? (True or False)")
-    is_prev_memory_required: bool = OutputField(desc="Is previous memory required for the query? (True or False)")
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return bool(value)
 
 
 class IntentClassifier:
@@ -34,42 +47,66 @@ class IntentClassifier:
     
     def __init__(self):
         """
-        Initialize the IntentClassifier by setting up the LLM and classification model.
+        Initialize the IntentClassifier by loading the classification model name from config.
         """
-        self.lm = self._initialize_llm()
-        self.model = self._create_classification_model()
+        self.model_name = self._load_model_name()
     
-    def _initialize_llm(self):
+    def _load_model_name(self) -> str:
         """
-        Initialize the LLM using the model name from the config file.
+        Load the classification model name from the config file.
         
         Returns:
-            Configured DSPy language model
+            OpenAI model name (without provider prefix)
         """
         project_root = Path(__file__).parent.parent.parent
         config_path = project_root / "configs" / "backend_config.yaml"
     
-        # Load configuration
-        config = load_config(config_path)
+        # Load configuration (parsed once per process)
+        config = cached_load_config(config_path)
         
         # Get model name from config
         model_name = config.get("intent_classification_model", {}).get("name", "openai/gpt-3.5-turbo")
+        return openai_model_name(model_name)
+    
+    def _build_messages(self, query: str) -> list:
+        """
+        Build the chat messages for classifying a query.
         
-        # Initialize OpenAI model with the configured name
-        lm = LM(model_name)
-        dspy.configure(lm=lm)
-        return lm
+        Args:
+            query: A query string to be classified
+            
+        Returns:
+            List of chat message dictionaries
+        """
+        return [
+            {"role": "system", "content": CLASSIFICATION_PROMPT},
+            {"role": "user", "content": query}
+        ]
     
-    def _create_classification_model(self):
+    def _parse_classification(self, content: str) -> dict:
         """
-        Create a DSPy Predict model for task classification.
+        Parse the model's JSON output into the classification dictionary.
         
+        Args:
+            content: JSON object string returned by the model
+            
         Returns:
-            Configured dspy.Predict model
+            Dictionary containing is_rag_required and is_prev_memory_required (both boolean)
+            
+        Raises:
+            ValueError: If the output is not a JSON object
         """
-        # Create and return the Predict model with the signature
-        model = dspy.Predict(TaskClassificationSignature)
-        return model
+        try:
+            result = json.loads(content)
+        except (TypeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Intent classifier returned invalid JSON: {content!r}") from e
+        if not isinstance(result, dict):
+            raise ValueError(f"Intent classifier returned invalid JSON: {content!r}")
+        
+        return {
+            "is_rag_required": _to_bool(result.get("is_rag_required", False)),
+            "is_prev_memory_required": _to_bool(result.get("is_prev_memory_required", False))
+        }
     
     def classify(self, query: str) -> dict:
         """
@@ -81,16 +118,61 @@ class IntentClassifier:
         Returns:
             Dictionary containing is_rag_required and is_prev_memory_required (both boolean)
         """
-        result = self.model(query=query)
+        # Shared client: connections are reused across calls
+        response = get_openai_client().chat.completions.create(
+            model=self.model_name,
+            messages=self._build_messages(query),
+            response_format={"type": "json_object"},
+            temperature=0
+        )
         
-        return {
-            "is_rag_required": result.is_rag_required,
-            "is_prev_memory_required": result.is_prev_memory_required
-        }
+        return self._parse_classification(response.choices[0].message.content)
+    
+    async def aclassify_many(self, queries: List[str], concurrency: int = 16) -> List[dict]:
+        """
+        Classify several queries concurrently.
+        
+        Args:
+            queries: Query strings to be classified
+            concurrency: Maximum number of classification requests in flight at once
+            
+        Returns:
+            List of classification dictionaries in the same order as queries
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async with create_async_openai_client() as client:
+            async def classify_one(query: str) -> dict:
+                async with semaphore:
+                    response = await client.chat.completions.create(
+                        model=self.model_name,
+                        messages=self._build_messages(query),
+                        response_format={"type": "json_object"},
+                        temperature=0
+                    )
+                return self._parse_classification(response.choices[0].message.content)
+            
+            return await asyncio.gather(*(classify_one(query) for query in queries))
+    
+    def classify_many(self, queries: List[str], concurrency: int = 16) -> List[dict]:
+        """
+        Classify several queries concurrently (for evaluation and offline workloads).
+        Must not be called from inside a running event loop; use aclassify_many there.
+        
+        Args:
+            queries: Query strings to be classified
+            concurrency: Maximum number of classification requests in flight at once
+            
+        Returns:
+            List of classification dictionaries in the same order as queries
+        """
+        if not queries:
+            return []
+        return asyncio.run(self.aclassify_many(queries, concurrency))
     
     def classify_task(self, prompt: str) -> dict:
         """
-        Classify a task using the DSPy model.
+        Classify a task using the classification model.
         (Legacy method name for backward compatibility)
         
         Args:
@@ -100,3 +182,23 @@ class IntentClassifier:
             Dictionary containing is_rag_required and is_prev_memory_required (both boolean)
         """
         return self.classify(prompt)
+
+
+# Global instance
+_intent_classifier = None
+_intent_classifier_lock = threading.Lock()
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """
+    Get the global IntentClassifier instance, creating it on first use.
+    
+    Returns:
+        IntentClassifier instance
+    """
+    global _intent_classifier
+    if _intent_classifier is None:
+        with _intent_classifier_lock:
+            if _intent_classifier is None:
+                _intent_classifier = IntentClassifier()
+    return _intent_classifier
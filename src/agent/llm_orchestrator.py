@@ -1,76 +1,130 @@
-import dspy
 from dotenv import load_dotenv
-from typing import Optional, Iterator
-from dspy import Signature, InputField, OutputField
-from dspy import LM
+from threading import Lock
+from typing import Optional, Iterator, AsyncIterator
+import asyncio
+import weakref
+import httpx
 import openai
-import os
+import re
+from .semantic_cache import SemanticCache
+from .openai_client import create_openai_client, create_async_openai_client
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Splits a cached answer into word-sized chunks (whitespace kept) for replay
+_REPLAY_CHUNK_PATTERN = re.compile(r"\s*\S+|\s+$")
 
-class AnswerGenerationSignature(Signature):
-    """
-    Signature for generating answers to user queries using retrieved context and conversation history.
-    
-    Inputs:
-        user_query: The user's query/question
-        retrieved_context: Context retrieved from the knowledge base
-        past_conversation: Previous conversation history
-        system_prompt: System prompt providing instructions for answer generation
-    
-    Output:
-        answer: The generated answer to the user's query
-    """
-    user_query: str = InputField(desc="The user's query or question")
-    retrieved_context: str = InputField(desc="Context retrieved from the knowledge base")
-    past_conversation: str = InputField(desc="Previous conversation history")
-    system_prompt: str = InputField(desc="System prompt with instructions for answer generation")
-    answer: str = OutputField(desc="The generated answer to the user's query")
+# Model used for answer generation unless the caller picks another one
+DEFAULT_MODEL = "gpt-4o"
+
+# Streams can run for a while; fail fast only on connection setup
+_OPENAI_TIMEOUT = httpx.Timeout(300.0, connect=10.0)
+
+_BASE_PROMPT = (
+    "You are a helpful AI assistant that answers questions based on the provided context "
+    "and conversation history. Your goal is to provide accurate, clear, and helpful responses."
+)
+
+# System prompts indexed by (has_context << 1) | has_past_conversation
+_SYSTEM_PROMPTS = (
+    # Neither context nor past conversation
+    f"{_BASE_PROMPT}\n\n"
+    "Answer the user's query to the best of your ability based on your general knowledge.",
+    # Past conversation only
+    f"{_BASE_PROMPT}\n\n"
+    "You have access to previous conversation history. "
+    "Use this history to provide context-aware responses. "
+    "If the user's query refers to previous conversation, reference it appropriately.",
+    # Context only
+    f"{_BASE_PROMPT}\n\n"
+    "You have access to retrieved context from the knowledge base. "
+    "Use this context to answer the user's query accurately. "
+    "If the context is relevant, base your answer on it. If not, provide a general helpful response.",
+    # Both context and past conversation
+    f"{_BASE_PROMPT}\n\n"
+    "You have access to both retrieved context from the knowledge base and previous "
+    "conversation history. Use both sources to provide a comprehensive answer. "
+    "If the context and conversation history are relevant, incorporate them into your response. "
+    "If the user's query refers to previous conversation, make sure to reference it appropriately.",
+)
 
 
 class LLMOrchestrator:
     """
-    A class for orchestrating LLM-based answer generation using DSPy.
+    A class for orchestrating LLM-based answer generation.
     Uses GPT-4o to generate responses based on user queries, retrieved context, and conversation history.
     """
     
-    def __init__(self):
+    def __init__(self, response_cache: Optional[SemanticCache] = None):
         """
-        Initialize the LLMOrchestrator by setting up the GPT-4o LLM and Predict module.
+        Initialize the LLMOrchestrator.
+        
+        Args:
+            response_cache: Optional semantic cache consulted before calling the LLM
         """
-        self.lm = self._initialize_llm()
-        self.model = self._create_predict_model()
+        self.response_cache = response_cache
+        # Persistent OpenAI client, created on first use and reused for every request
+        self._openai = None
+        self._openai_lock = Lock()
+        # Async clients are bound to the event loop they were created on, so there is one
+        # per loop; an entry goes away with its loop instead of being overwritten
+        self._aopenai_clients = weakref.WeakKeyDictionary()
     
-    def _initialize_llm(self):
+    def _get_client(self) -> openai.OpenAI:
         """
-        Initialize the GPT-4o LLM using DSPy.
+        Get the persistent OpenAI client, creating it on first use.
+        
+        Long generations stream for a while, so the read timeout is generous
+        while connection setup still fails fast.
         
         Returns:
-            Configured DSPy language model (GPT-4o)
+            openai.OpenAI client instance
         """
-        # Initialize GPT-4o model
-        lm = LM("openai/gpt-4o")
-        dspy.configure(lm=lm)
-        return lm
+        if self._openai is None:
+            with self._openai_lock:
+                if self._openai is None:
+                    self._openai = create_openai_client(timeout=_OPENAI_TIMEOUT)
+        return self._openai
     
-    def _create_predict_model(self):
+    def _get_async_client(self) -> openai.AsyncOpenAI:
         """
-        Create a DSPy Predict model for answer generation.
+        Get the persistent AsyncOpenAI client for the running event loop,
+        creating it on first use in that loop.
         
         Returns:
-            Configured dspy.Predict model with AnswerGenerationSignature
+            openai.AsyncOpenAI client instance
         """
-        # Create and return the Predict model with the signature
-        model = dspy.Predict(AnswerGenerationSignature)
-        return model
+        loop = asyncio.get_running_loop()
+        client = self._aopenai_clients.get(loop)
+        if client is None:
+            client = create_async_openai_client(timeout=_OPENAI_TIMEOUT)
+            self._aopenai_clients[loop] = client
+        return client
+    
+    def close(self) -> None:
+        """
+        Close the OpenAI client and its pooled HTTP connections.
+        """
+        with self._openai_lock:
+            if self._openai is not None:
+                self._openai.close()
+                self._openai = None
+    
+    async def aclose(self) -> None:
+        """
+        Close the running event loop's async OpenAI client and its pooled HTTP connections.
+        """
+        client = self._aopenai_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
     
     def generate_response(
         self, 
         query: str, 
         context: Optional[str] = None, 
-        past_conversation: Optional[str] = None
+        past_conversation: Optional[str] = None,
+        model: Optional[str] = None
     ) -> str:
         """
         Generate an appropriate response to the user's query using the retrieved context
@@ -80,40 +134,85 @@ class LLMOrchestrator:
             query: The user's query string
             context: Retrieved context from the knowledge base (can be None or empty string)
             past_conversation: Previous conversation history (can be None or empty string)
+            model: OpenAI model to use (default: gpt-4o)
             
         Returns:
             Generated answer string
         """
+        # Single code path: collect the streamed answer (cached answers are replayed by the stream)
+        return "".join(self.generate_response_stream(query, context, past_conversation, model))
+    
+    def generate_response_stream(
+        self, 
+        query: str, 
+        context: Optional[str] = None, 
+        past_conversation: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Generate a streaming response to the user's query using OpenAI's streaming API.
+        
+        Args:
+            query: The user's query string
+            context: Retrieved context from the knowledge base (can be None or empty string)
+            past_conversation: Previous conversation history (can be None or empty string)
+            model: OpenAI model to use (default: gpt-4o)
+            
+        Yields:
+            Token chunks as they are generated
+        """
         # Handle None values by converting to empty strings
         context = context if context is not None else ""
         past_conversation = past_conversation if past_conversation is not None else ""
         
-        # Generate an appropriate system prompt
-        system_prompt = self._generate_system_prompt(context, past_conversation)
+        model = model or DEFAULT_MODEL
         
-        # Call the Predict model with all inputs
-        result = self.model(
-            user_query=query,
-            retrieved_context=context if context else "No context available.",
-            past_conversation=past_conversation if past_conversation else "No previous conversation.",
-            system_prompt=system_prompt
+        # Replay a cached answer word by word for a semantically equivalent query. Without
+        # retrieved context, similar queries (e.g. "what is 2+2" / "what is 2+3") would all
+        # share one partition, so only queries answered from context are cached.
+        cache_key = None
+        if self.response_cache is not None and context:
+            cache_key = self.response_cache.make_key(query, context, past_conversation, model)
+            cached_answer = self.response_cache.lookup(cache_key)
+            if cached_answer is not None:
+                yield from _REPLAY_CHUNK_PATTERN.findall(cached_answer)
+                return
+        
+        # Call OpenAI API with streaming (reusing pooled connections)
+        stream = self._get_client().chat.completions.create(
+            model=model,
+            messages=self._build_messages(query, context, past_conversation),
+            stream=True,
+            temperature=0.7
         )
         
-        return result.answer
+        # Yield tokens as they arrive
+        tokens = []
+        for chunk in stream:
+            if chunk.choices[0].delta.content is not None:
+                tokens.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+        
+        # Only cache non-empty answers that streamed to completion
+        answer = "".join(tokens)
+        if cache_key is not None and answer:
+            self.response_cache.insert(cache_key, answer)
     
-    def generate_response_stream(
+    async def agenerate_response_stream(
         self, 
         query: str, 
         context: Optional[str] = None, 
-        past_conversation: Optional[str] = None
-    ) -> Iterator[str]:
+        past_conversation: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> AsyncIterator[str]:
         """
-        Generate a streaming response to the user's query using OpenAI's streaming API.
+        Generate a streaming response without blocking the event loop, using AsyncOpenAI.
         
         Args:
             query: The user's query string
             context: Retrieved context from the knowledge base (can be None or empty string)
             past_conversation: Previous conversation history (can be None or empty string)
+            model: OpenAI model to use (default: gpt-4o)
             
         Yields:
             Token chunks as they are generated
@@ -122,6 +221,54 @@ class LLMOrchestrator:
         context = context if context is not None else ""
         past_conversation = past_conversation if past_conversation is not None else ""
         
+        model = model or DEFAULT_MODEL
+        
+        # Replay a cached answer word by word for a semantically equivalent query, only
+        # for queries answered from retrieved context (see generate_response_stream);
+        # embedding the query is CPU-bound, so it runs off the event loop
+        cache_key = None
+        if self.response_cache is not None and context:
+            cache_key = await asyncio.to_thread(
+                self.response_cache.make_key, query, context, past_conversation, model
+            )
+            cached_answer = self.response_cache.lookup(cache_key)
+            if cached_answer is not None:
+                for piece in _REPLAY_CHUNK_PATTERN.findall(cached_answer):
+                    yield piece
+                return
+        
+        # Call OpenAI API with streaming (reusing pooled connections)
+        stream = await self._get_async_client().chat.completions.create(
+            model=model,
+            messages=self._build_messages(query, context, past_conversation),
+            stream=True,
+            temperature=0.7
+        )
+        
+        # Yield tokens as they arrive
+        tokens = []
+        async for chunk in stream:
+            if chunk.choices[0].delta.content is not None:
+                tokens.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+        
+        # Only cache non-empty answers that streamed to completion
+        answer = "".join(tokens)
+        if cache_key is not None and answer:
+            self.response_cache.insert(cache_key, answer)
+    
+    def _build_messages(self, query: str, context: str, past_conversation: str) -> list:
+        """
+        Build the chat messages for the OpenAI API.
+        
+        Args:
+            query: The user's query string
+            context: Retrieved context from the knowledge base (empty string if not available)
+            past_conversation: Previous conversation history (empty string if not available)
+        
+        Returns:
+            List of chat message dictionaries
+        """
         # Generate an appropriate system prompt
         system_prompt = self._generate_system_prompt(context, past_conversation)
         
@@ -143,26 +290,7 @@ class LLMOrchestrator:
             user_content = f"Context from knowledge base:\n{context}\n\nUser query: {query}"
         
         messages.append({"role": "user", "content": user_content})
-        
-        # Get OpenAI API key
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
-        
-        # Call OpenAI API with streaming
-        client = openai.OpenAI(api_key=api_key)
-        
-        stream = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            stream=True,
-            temperature=0.7
-        )
-        
-        # Yield tokens as they arrive
-        for chunk in stream:
-            if chunk.choices[0].delta.content is not None:
-                yield chunk.choices[0].delta.content
+        return messages
     
     def _generate_system_prompt(self, context: str, past_conversation: str) -> str:
         """
@@ -175,42 +303,30 @@ class LLMOrchestrator:
         Returns:
             System prompt string
         """
-        base_prompt = (
-            "You are a helpful AI assistant that answers questions based on the provided context "
-            "and conversation history. Your goal is to provide accurate, clear, and helpful responses."
-        )
-        
-        # Check if context and past_conversation are non-empty strings
-        has_context = context and context.strip()
-        has_past_conversation = past_conversation and past_conversation.strip()
-        
-        if has_context and has_past_conversation:
-            system_prompt = (
-                f"{base_prompt}\n\n"
-                "You have access to both retrieved context from the knowledge base and previous "
-                "conversation history. Use both sources to provide a comprehensive answer. "
-                "If the context and conversation history are relevant, incorporate them into your response. "
-                "If the user's query refers to previous conversation, make sure to reference it appropriately."
-            )
-        elif has_context:
-            system_prompt = (
-                f"{base_prompt}\n\n"
-                "You have access to retrieved context from the knowledge base. "
-                "Use this context to answer the user's query accurately. "
-                "If the context is relevant, base your answer on it. If not, provide a general helpful response."
-            )
-        elif has_past_conversation:
-            system_prompt = (
-                f"{base_prompt}\n\n"
-                "You have access to previous conversation history. "
-                "Use this history to provide context-aware responses. "
-                "If the user's query refers to previous conversation, reference it appropriately."
-            )
-        else:
-            system_prompt = (
-                f"{base_prompt}\n\n"
-                "Answer the user's query to the best of your ability based on your general knowledge."
-            )
-        
-        return system_prompt
+        # Index: bit 1 = has context, bit 0 = has past conversation
+        index = (bool(context and context.strip()) << 1) | bool(past_conversation and past_conversation.strip())
+        return _SYSTEM_PROMPTS[index]
+
+
+# Global instance
+_llm_orchestrator = None
+_llm_orchestrator_lock = Lock()
 
+
+def get_llm_orchestrator(response_cache: Optional[SemanticCache] = None) -> LLMOrchestrator:
+    """
+    Get the global LLMOrchestrator instance, creating it on first use.
+    
+    Args:
+        response_cache: Semantic cache for the instance; only used when the
+            instance is first created
+    
+    Returns:
+        LLMOrchestrator instance
+    """
+    global _llm_orchestrator
+    if _llm_orchestrator is None:
+        with _llm_orchestrator_lock:
+            if _llm_orchestrator is None:
+                _llm_orchestrator = LLMOrchestrator(response_cache=response_cache)
+    return _llm_orchestrator
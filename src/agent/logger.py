@@ -1,9 +1,12 @@
 import os
+import queue
+import atexit
+import threading
 import psycopg2
-from datetime import datetime
-from typing import Dict, Any
+from typing import List, Optional, Tuple
 from psycopg2.extras import Json
 from .db_connection_manager import get_connection_manager
+from .memory_retriever import get_memory_retriever
 
 
 class Logger:
@@ -16,126 +19,159 @@ class Logger:
         Initialize the Logger with database connection manager.
         """
         self._connection_manager = get_connection_manager()
+        self._memory_retriever = get_memory_retriever()
     
     def _get_db_connection(self):
         """
-        Get a database connection using the connection manager (with failover).
+        Borrow a pooled database connection using the connection manager (with failover).
         
         Returns:
-            psycopg2 connection object
+            Context manager yielding a psycopg2 connection that is returned to the pool on exit
         """
-        return self._connection_manager.get_connection()
+        return self._connection_manager.connection()
     
-    def save_conversation(self, user_id: int, query: str, llm_response: str) -> None:
+    def save_many(self, records: List[Tuple]) -> None:
         """
-        Save the query and LLM response to the 'conversation_history' table.
+        Save a batch of conversation/log records atomically in one round trip.
         
+        Each record is a tuple of
+        (user_id, query, processed_query, context, past_memory, llm_response).
+        A conversation_history row is only written for records that have a user_id,
+        query, and llm_response; every record gets a logs row.
+        
+        Both multi-row INSERTs are sent as one query string on an autocommit
+        connection, which PostgreSQL runs as a single implicit transaction, so there
+        is no separate BEGIN/COMMIT exchange. Conversation timestamps come from
+        clock_timestamp() rather than the column default, so rows written in the
+        same transaction keep their queue order. The statements are not prepared:
+        their text varies with the batch size, and parsing and planning are paid
+        once per batch rather than once per record.
+
         Args:
-            user_id: The user ID
-            query: The user's query
-            llm_response: The LLM-generated response
+            records: List of record tuples to insert
         """
-        conn = None
-        cursor = None
+        if not records:
+            return
+        
+        conversation_rows = [
+            (user_id, query, llm_response)
+            for user_id, query, _, _, _, llm_response in records
+            if user_id is not None and query and llm_response
+        ]
+        log_rows = [
+            (user_id, query, processed_query, context, Json(past_memory), llm_response)
+            for user_id, query, processed_query, context, past_memory, llm_response in records
+        ]
         
         try:
-            # Get database connection
-            conn = self._get_db_connection()
-            cursor = conn.cursor()
-            
-            # Insert query and response into conversation_history table
-            insert_query = """
-                INSERT INTO conversation_history (user_id, timestamp, user_query, llm_response)
-                VALUES (%s, %s, %s, %s)
-            """
-            
-            timestamp = datetime.now()
-            cursor.execute(insert_query, (user_id, timestamp, query, llm_response))
-            
-            # Commit the transaction
-            conn.commit()
+            # Borrow a pooled connection; it is returned to the pool on exit
+            with self._get_db_connection() as conn, conn.cursor() as cursor:
+                statements = []
+                if conversation_rows:
+                    statements.append(
+                        b"INSERT INTO conversation_history (user_id, timestamp, user_query, llm_response) VALUES "
+                        + b",".join(cursor.mogrify("(%s, clock_timestamp(), %s, %s)", row) for row in conversation_rows)
+                    )
+                statements.append(
+                    b"INSERT INTO logs (u_id, query, processed_query, context, past_memory, llm_response) VALUES "
+                    + b",".join(cursor.mogrify("(%s, %s, %s, %s, %s, %s)", row) for row in log_rows)
+                )
+                
+                # One message, one implicit transaction: all rows commit or none do
+                conn.autocommit = True
+                try:
+                    cursor.execute(b";\n".join(statements))
+                finally:
+                    conn.autocommit = False
             
+            # The users' cached past conversations no longer include the latest ones
+            for user_id in {row[0] for row in conversation_rows}:
+                self._memory_retriever.invalidate(user_id)
+        
         except psycopg2.Error as e:
             # Handle database-specific errors
-            if conn:
-                conn.rollback()
-            raise Exception(f"Database error while saving conversation: {e}")
+            raise Exception(f"Database error while saving log batch: {e}")
         
         except Exception as e:
             # Handle any other errors
-            if conn:
-                conn.rollback()
-            raise Exception(f"Error saving conversation: {e}")
+            raise Exception(f"Error saving log batch: {e}")
+
+
+class AsyncLogger:
+    """
+    Writes conversation and log records to the database from a background thread
+    so database latency stays off the request path.
+    
+    Records are queued by save_all and written in batches by a daemon worker using
+    Logger.save_many. If the queue is full the record is written synchronously
+    instead of being dropped, since conversation_history also feeds memory retrieval.
+    """
+    
+    def __init__(self, db_logger: Optional[Logger] = None, maxsize: int = 1024, batch_size: int = 100):
+        """
+        Initialize the AsyncLogger and start its background worker.
         
-        finally:
-            # Clean up cursor (connection is kept for reuse)
-            if cursor:
-                cursor.close()
+        Args:
+            db_logger: Logger used to write batches (a new one is created if not provided)
+            maxsize: Maximum number of records waiting to be written
+            batch_size: Maximum number of records written per transaction
+        """
+        self._logger = db_logger or Logger()
+        self._batch_size = batch_size
+        self._q = queue.Queue(maxsize=maxsize)
+        self._t = threading.Thread(target=self._drain, name="async-logger", daemon=True)
+        self._t.start()
+        atexit.register(self.flush)
     
-    def save_logs(self, state: Dict[str, Any]) -> None:
+    def save_all(
+        self,
+        user_id: int,
+        query: str,
+        processed_query: str,
+        context: str,
+        past_memory: str,
+        llm_response: str
+    ) -> None:
         """
-        Save relevant workflow information present in the state to the 'logs' table,
-        matching the current schema.
-
-        The 'logs' table has the following columns:
-          - u_id (INT)
-          - query (TEXT)
-          - processed_query (TEXT)
-          - context (TEXT)
-          - past_memory (TEXT or JSON-encoded string)
-          - llm_response (TEXT)
-
+        Queue the conversation and workflow log for one query to be written in the background.
+        
         Args:
-            state: The state dictionary containing all workflow information
+            user_id: The user ID
+            query: The user's query
+            processed_query: The processed query
+            context: Retrieved context passed to the LLM
+            past_memory: Past conversation history passed to the LLM
+            llm_response: The LLM-generated response
         """
-        conn = None
-        cursor = None
-
+        record = (user_id, query, processed_query, context, past_memory, llm_response)
         try:
-            # Get database connection
-            conn = self._get_db_connection()
-            cursor = conn.cursor()
-
-            # Prepare data according to the logs table schema
-            u_id = state.get("u_id")
-            query = state.get("query")
-            processed_query = state.get("processed_query")
-            context_value = state.get("context")
-            past_memory = state.get("past_memory", "[]")
-            llm_response = state.get("llm_response")
-
-            insert_query = """
-                INSERT INTO logs (u_id, query, processed_query, context, past_memory, llm_response)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            cursor.execute(
-                insert_query,
-                (u_id, query, processed_query, context_value, past_memory, llm_response)
-            )
-
-            # Commit the transaction
-            conn.commit()
-
-        except psycopg2.Error as e:
-            # Handle database-specific errors
-            if conn:
-                conn.rollback()
-            raise Exception(f"Database error while saving logs: {e}")
-
-        except Exception as e:
-            # Handle any other errors
-            if conn:
-                conn.rollback()
-            raise Exception(f"Error saving logs: {e}")
-
-        finally:
-            # Clean up cursor (connection is kept for reuse)
-            if cursor:
-                cursor.close()
-
-    def close_connection(self):
+            self._q.put_nowait(record)
+        except queue.Full:
+            print("Warning: Log queue is full, writing record synchronously")
+            self._logger.save_many([record])
+    
+    def _drain(self) -> None:
         """
-        Close the database connection if it exists.
+        Worker loop: wait for a record, collect up to batch_size queued records, and write them.
         """
-        self._connection_manager.close_connection()
-
+        while True:
+            batch = [self._q.get()]
+            try:
+                while len(batch) < self._batch_size:
+                    batch.append(self._q.get(timeout=0.05))
+            except queue.Empty:
+                pass
+            
+            try:
+                self._logger.save_many(batch)
+            except Exception as e:
+                print(f"Warning: Failed to write {len(batch)} log record(s): {e}")
+            finally:
+                for _ in batch:
+                    self._q.task_done()
+    
+    def flush(self) -> None:
+        """
+        Block until every queued record has been written (or failed).
+        """
+        self._q.join()
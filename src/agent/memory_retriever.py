@@ -1,6 +1,30 @@
 import os
+import threading
 import psycopg2
-from .db_connection_manager import get_connection_manager
+from cachetools import TTLCache
+from .db_connection_manager import get_connection_manager, execute_prepared
+
+# Past conversations are cached per user for a short time; saving a new
+# conversation for the user invalidates the entry.
+MEMORY_CACHE_MAXSIZE = 10000
+MEMORY_CACHE_TTL_SECONDS = 30
+
+# Past 3 conversations for a user, formatted and joined in SQL. The inner query
+# takes the 3 most recent rows (served by the idx_conv_hist_user_ts index);
+# string_agg joins them oldest first. Run as a server-side prepared statement.
+GET_PAST_CONVERSATIONS_SQL = """
+    SELECT string_agg(
+        format(E'User: %s\\nAssistant: %s', user_query, llm_response),
+        E'\\n\\n' ORDER BY timestamp ASC
+    )
+    FROM (
+        SELECT user_query, llm_response, timestamp
+        FROM conversation_history
+        WHERE user_id = $1
+        ORDER BY timestamp DESC
+        LIMIT 3
+    ) recent
+"""
 
 
 class MemoryRetriever:
@@ -13,15 +37,22 @@ class MemoryRetriever:
         Initialize the MemoryRetriever with database connection manager.
         """
         self._connection_manager = get_connection_manager()
+        self._cache = TTLCache(maxsize=MEMORY_CACHE_MAXSIZE, ttl=MEMORY_CACHE_TTL_SECONDS)
+        self._cache_lock = threading.Lock()
+        # Per-user count of invalidations. A database read only fills the cache if no
+        # invalidation happened while it ran, so a read that started before a new
+        # conversation was committed can't cache the outdated result. Bounded like the
+        # cache itself: an entry only matters while a read that started before it runs.
+        self._generations = TTLCache(maxsize=MEMORY_CACHE_MAXSIZE, ttl=MEMORY_CACHE_TTL_SECONDS)
     
     def _get_db_connection(self):
         """
-        Get a database connection using the connection manager (with failover).
+        Borrow a pooled database connection using the connection manager (with failover).
         
         Returns:
-            psycopg2 connection object
+            Context manager yielding a psycopg2 connection that is returned to the pool on exit
         """
-        return self._connection_manager.get_connection()
+        return self._connection_manager.connection()
     
     def get_past_conversations(self, user_id: int) -> str:
         """
@@ -32,65 +63,65 @@ class MemoryRetriever:
             user_id: The user ID to fetch conversations for
             
         Returns:
-            A single string containing the past 3 conversations formatted as:
+            A single string containing the past 3 conversations in chronological
+            order (oldest first), formatted as:
             "User: [query]\nAssistant: [response]\n\n" for each conversation
         """
-        conn = None
-        cursor = None
+        with self._cache_lock:
+            cached = self._cache.get(user_id)
+            generation = self._generations.get(user_id, 0)
+        if cached is not None:
+            return cached
         
         try:
-            # Get database connection
-            conn = self._get_db_connection()
-            cursor = conn.cursor()
-            
-            # Query to fetch the past 3 conversations for the user
-            # Ordered by timestamp DESC to get the most recent first
-            query = """
-                SELECT user_query, llm_response, timestamp
-                FROM conversation_history
-                WHERE user_id = %s
-                ORDER BY timestamp DESC
-                LIMIT 3;
-            """
-            
-            # Execute the query
-            cursor.execute(query, (user_id,))
+            # Borrow a pooled connection; it is returned to the pool on exit
+            with self._get_db_connection() as conn, conn.cursor() as cursor:
+                # Execute the prepared query; string_agg returns NULL when there are no rows
+                execute_prepared(cursor, "get_past", GET_PAST_CONVERSATIONS_SQL, (user_id,))
+                combined_string = cursor.fetchone()[0] or ""
             
-            # Fetch all results
-            results = cursor.fetchall()
-            
-            # Convert results to a single string
-            conversation_strings = []
-            for user_query, llm_response, timestamp in results:
-                # Format each conversation as a readable string
-                conversation_str = f"User: {user_query}\nAssistant: {llm_response}"
-                conversation_strings.append(conversation_str)
-            
-            # Join all conversations with double newlines for separation
-            combined_string = "\n\n".join(conversation_strings)
+            with self._cache_lock:
+                if self._generations.get(user_id, 0) == generation:
+                    self._cache[user_id] = combined_string
             
             return combined_string
             
         except psycopg2.Error as e:
             # Handle database-specific errors
-            if conn:
-                conn.rollback()
             raise Exception(f"Database error while fetching conversations: {e}")
         
         except Exception as e:
             # Handle any other errors
-            if conn:
-                conn.rollback()
             raise Exception(f"Error fetching past conversations: {e}")
-        
-        finally:
-            # Clean up cursor (connection is kept for reuse)
-            if cursor:
-                cursor.close()
     
-    def close_connection(self):
+    def invalidate(self, user_id: int) -> None:
         """
-        Close the database connection if it exists.
+        Drop the cached past conversations for a user.
+        
+        Args:
+            user_id: The user ID whose cached conversations are stale
         """
-        self._connection_manager.close_connection()
+        with self._cache_lock:
+            self._cache.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+
+# Global instance
+_memory_retriever = None
+_memory_retriever_lock = threading.Lock()
+
 
+def get_memory_retriever() -> MemoryRetriever:
+    """
+    Get the global MemoryRetriever instance, so the conversation cache is
+    shared by every caller in the process.
+    
+    Returns:
+        MemoryRetriever instance
+    """
+    global _memory_retriever
+    if _memory_retriever is None:
+        with _memory_retriever_lock:
+            if _memory_retriever is None:
+                _memory_retriever = MemoryRetriever()
+    return _memory_retriever
@@ -0,0 +1,78 @@
+from typing import List, Optional, Union
+import numpy as np
+
+
+class OnnxEmbedder:
+    """
+    Runs a BGE-style embedding model exported to ONNX (optionally INT8-quantized)
+    with ONNX Runtime.
+
+    Mirrors the FlagModel.encode interface used by ContextRetriever: a single string
+    returns a 1-D vector, a list returns a 2-D array. Embeddings use CLS pooling
+    followed by L2 normalization, which is how FlagModel produces bge-m3 dense
+    vectors, so results stay comparable with vectors already in the index.
+
+    To produce a quantized model:
+        optimum-cli export onnx --model BAAI/bge-m3 --task feature-extraction bge-m3-onnx/
+        python -c "from onnxruntime.quantization import quantize_dynamic, QuantType; \
+            quantize_dynamic('bge-m3-onnx/model.onnx', 'bge-m3-onnx/model_int8.onnx', \
+            weight_type=QuantType.QInt8)"
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        tokenizer_name: str,
+        max_length: int = 512,
+        providers: Optional[List[str]] = None
+    ):
+        """
+        Initialize the OnnxEmbedder.
+
+        Args:
+            model_path: Path to the .onnx model file
+            tokenizer_name: Hugging Face name or local path of the model's tokenizer
+            max_length: Maximum number of tokens per text
+            providers: ONNX Runtime execution providers (default: CPUExecutionProvider)
+
+        Raises:
+            ImportError: If onnxruntime or transformers is not installed
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+        self._session = ort.InferenceSession(
+            model_path, providers=providers or ["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self._session.get_inputs()}
+
+    def encode(self, texts: Union[str, List[str]]) -> np.ndarray:
+        """
+        Convert one text or a list of texts to normalized embeddings.
+
+        Args:
+            texts: A single string or a list of strings
+
+        Returns:
+            1-D array for a single string, 2-D array (one row per text) for a list
+        """
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+
+        encoded = self.tokenizer(
+            batch,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np"
+        )
+        feeds = {name: value.astype(np.int64) for name, value in encoded.items() if name in self._input_names}
+        last_hidden_state = self._session.run(None, feeds)[0]
+
+        # CLS pooling + L2 normalization
+        embeddings = last_hidden_state[:, 0]
+        embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True).clip(min=1e-12)
+
+        return embeddings[0] if single else embeddings
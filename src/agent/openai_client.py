@@ -0,0 +1,107 @@
+import os
+import httpx
+import openai
+from threading import Lock
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+_client = None
+_client_lock = Lock()
+
+
+def create_openai_client(timeout=30) -> openai.OpenAI:
+    """
+    Create an OpenAI client on an HTTP/2 httpx connection pool with keep-alive.
+
+    Args:
+        timeout: httpx timeout (seconds or httpx.Timeout)
+
+    Returns:
+        openai.OpenAI client instance
+
+    Raises:
+        ValueError: If OPENAI_API_KEY is not set
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not found in environment variables")
+
+    http_client = httpx.Client(
+        http2=True,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_keepalive_connections=40,
+            max_connections=100,
+            keepalive_expiry=30
+        )
+    )
+    return openai.OpenAI(api_key=api_key, http_client=http_client)
+
+
+def get_openai_client() -> openai.OpenAI:
+    """
+    Get the shared OpenAI client for the process.
+
+    The client is created once on top of an HTTP/2 httpx connection pool, so
+    calls reuse open TLS connections instead of paying a handshake each time.
+
+    Returns:
+        openai.OpenAI client instance
+
+    Raises:
+        ValueError: If OPENAI_API_KEY is not set
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_openai_client()
+    return _client
+
+
+def create_async_openai_client(timeout=30) -> openai.AsyncOpenAI:
+    """
+    Create an AsyncOpenAI client on an HTTP/2 httpx connection pool.
+
+    Async clients are bound to the event loop they are used on, so a new one is
+    created per loop; use it as an async context manager to close its connections.
+
+    Args:
+        timeout: httpx timeout (seconds or httpx.Timeout)
+
+    Returns:
+        openai.AsyncOpenAI client instance
+
+    Raises:
+        ValueError: If OPENAI_API_KEY is not set
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not found in environment variables")
+
+    http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_keepalive_connections=40,
+            max_connections=100,
+            keepalive_expiry=30
+        )
+    )
+    return openai.AsyncOpenAI(api_key=api_key, http_client=http_client)
+
+
+def openai_model_name(model_name: str) -> str:
+    """
+    Convert a provider-prefixed model name (e.g. "openai/gpt-4o") to the bare
+    name expected by the OpenAI API.
+
+    Args:
+        model_name: Model name, with or without the "openai/" prefix
+
+    Returns:
+        Model name without the provider prefix
+    """
+    return model_name.split("/", 1)[1] if model_name.startswith("openai/") else model_name
@@ -1,18 +1,112 @@
-from typing import TypedDict, Union, Iterator
+import re
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, TypedDict, Union, Iterator, AsyncIterator, Optional
+from langchain_core.runnables import RunnableLambda
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, START, END
 from .query_processing import QueryProcessor
-from .intent_classifier import IntentClassifier
+from .intent_classifier import get_intent_classifier
 from .context_retriever import ContextRetriever
-from .memory_retriever import MemoryRetriever
-from .llm_orchestrator import LLMOrchestrator
-from .logger import Logger
+from .memory_retriever import get_memory_retriever
+from .llm_orchestrator import LLMOrchestrator, get_llm_orchestrator
+from .logger import AsyncLogger
+from .semantic_cache import SemanticCache
+from .utils import cached_load_config
+from .db_connection_manager import get_connection_manager
+
+
+def create_response_cache(embed_fn):
+    """
+    Create the semantic LLM response cache from the backend config.
+    
+    Args:
+        embed_fn: Function mapping a query string to an embedding vector
+        
+    Returns:
+        SemanticCache instance, or None if the cache is disabled
+    """
+    cache_config = cached_load_config().get("response_cache", {})
+    if not cache_config.get("enabled", False):
+        return None
+    return SemanticCache(
+        embed_fn=embed_fn,
+        threshold=cache_config.get("similarity_threshold", 0.92),
+        capacity=cache_config.get("capacity", 10000)
+    )
+
+
+# Pipeline components are created on first use, so importing this module does not
+# load the embedding model or open clients. The intent classifier and memory
+# retriever come from their own module-level getters.
+@lru_cache(maxsize=1)
+def get_query_processor() -> QueryProcessor:
+    """
+    Get the shared QueryProcessor, creating it on first use.
+    
+    Returns:
+        QueryProcessor instance
+    """
+    return QueryProcessor()
+
+
+@lru_cache(maxsize=1)
+def get_context_retriever() -> ContextRetriever:
+    """
+    Get the shared ContextRetriever (embedding model + Pinecone index), creating it on first use.
+    
+    Returns:
+        ContextRetriever instance
+    """
+    return ContextRetriever()
+
+
+@lru_cache(maxsize=1)
+def get_orchestrator_llm() -> LLMOrchestrator:
+    """
+    Get the shared LLMOrchestrator with the semantic response cache, creating it on first use.
+    
+    Returns:
+        LLMOrchestrator instance
+    """
+    return get_llm_orchestrator(
+        response_cache=create_response_cache(get_context_retriever().embed_query)
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_logger() -> AsyncLogger:
+    """
+    Get the shared background logger, starting its worker on first use.
+    
+    Returns:
+        AsyncLogger instance
+    """
+    return AsyncLogger()
+
+
+# Small model for trivial queries (greetings, acknowledgements, yes/no, plain arithmetic)
+_trivial_model_config = cached_load_config().get("trivial_query_model", {})
+TRIVIAL_QUERY_MODEL = _trivial_model_config.get("name", "gpt-4o-mini")
+TRIVIAL_QUERY_MAX_LENGTH = _trivial_model_config.get("max_query_length", 60)
+TRIVIAL_QUERY_PATTERN = re.compile(
+    r"^(?:"
+    r"(?:hi|hello|hey|thanks|thank you|thx|ok|okay|yes|no|yep|nope|sure|bye|goodbye"
+    r"|good (?:morning|afternoon|evening|night))(?: there)?"
+    r"|(?:what is |what's |calculate )?[\d\s+\-*/().^%=x]*\d[\d\s+\-*/().^%=x]*"
+    r")[\s!.,?]*$"
+)
+
+
+# Speculative context retrievals, keyed by the query they retrieve context for.
+# Entries are removed when the retrieval finishes; the result stays in the
+# ContextRetriever cache.
+_context_prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="context-prefetch")
+_context_prefetches: Dict[str, Future] = {}
+_context_prefetches_lock = threading.Lock()
 
-query_processor = QueryProcessor()
-intent_classifier = IntentClassifier()
-context_retriever = ContextRetriever()
-memory_retriever = MemoryRetriever()
-llm_orchestrator = LLMOrchestrator()
-logger = Logger()
 
 class QueryState(TypedDict):
     """
@@ -38,53 +132,124 @@ class QueryState(TypedDict):
     llm_response: str
 
 
+def select_model(state: QueryState) -> Optional[str]:
+    """
+    Pick the LLM for the response: the small model for trivial queries that need
+    neither RAG nor memory, otherwise the default model.
+    
+    Args:
+        state: The current state with the query and classification results
+        
+    Returns:
+        Model name for trivial queries, or None to use the default model
+    """
+    if state.get("is_rag_required", False) or state.get("is_prev_memory_required", False):
+        return None
+    
+    query = state.get("query", "").strip().lower()
+    if len(query) <= TRIVIAL_QUERY_MAX_LENGTH and TRIVIAL_QUERY_PATTERN.match(query):
+        return TRIVIAL_QUERY_MODEL
+    return None
+
+
 def process_query_node(state: QueryState) -> QueryState:
     """
-    Node function that processes the query and adds processed_query to the state.
-    Optionally optimizes the query using LLM and past conversation history.
-    Also retrieves and stores past conversations in memory to avoid duplicate RDS fetches.
+    Node function that normalizes the query (lowercase, whitespace) and adds it to the
+    state as processed_query. LLM optimization runs separately in optimize_query_node,
+    in parallel with intent classification.
     
     Args:
-        state: The current state containing the query and user_id
+        state: The current state containing the query
         
     Returns:
-        Updated state with processed_query and memory (if user_id is available) added
+        Updated state with the normalized processed_query
     """
+    return {
+        "processed_query": get_query_processor().normalize(state["query"])
+    }
+
+
+def optimize_query_node(state: QueryState) -> QueryState:
+    """
+    Node function that optimizes the normalized query using LLM and past conversation
+    history. Also stores the retrieved past conversations in memory to avoid duplicate
+    RDS fetches in get_memory_node.
     
+    Args:
+        state: The current state containing the normalized processed_query and user_id
+        
+    Returns:
+        Updated state with optimized processed_query and memory, or unchanged
+        state if no user_id is available
+    """
     # Get user_id from state for query optimization
     user_id = state.get("user_id")
     
-    # Process and optimize the query, and retrieve past conversations
-    # This avoids fetching from RDS again in get_memory_node
-    if user_id is not None:
-        processed_query, past_conversations = query_processor.process(
-            query=state["query"],
-            user_id=user_id,
-            optimize=True,
-            return_memory=True
-        )
-        
-        # Clean up database connection after retrieving memory
-        try:
-            query_processor.memory_retriever.close_connection()
-        except:
-            pass
-        
-        return {
-            "processed_query": processed_query,
-            "memory": past_conversations
-        }
-    else:
-        # No user_id, so just process the query without optimization
-        processed_query = query_processor.process(
-            query=state["query"],
-            user_id=None,
-            optimize=False
-        )
+    if user_id is None:
+        # No user_id, so keep the normalized query without optimization; its context
+        # can be retrieved while intent classification is still running
+        prefetch_context(state["processed_query"])
+        return {}
+    
+    processed_query, past_conversations = get_query_processor().optimize_with_memory(
+        state["processed_query"], user_id
+    )
+    
+    # Without past conversations the query is not rewritten, so its context can
+    # already be retrieved (a rewritten query would never hit the prefetched entry)
+    if not past_conversations or not past_conversations.strip():
+        prefetch_context(processed_query)
+    
+    return {
+        "processed_query": processed_query,
+        "memory": past_conversations
+    }
+
+
+def prefetch_context(query: str) -> None:
+    """
+    Start retrieving context for a query in the background, without waiting for it.
+    
+    The result lands in the ContextRetriever cache, and get_context_node waits for a
+    retrieval of the same query that is still running instead of starting another one.
+    Trivial queries (greetings, arithmetic) are skipped, since they never need context.
+    
+    Args:
+        query: The query that get_context_node will retrieve context for
+    """
+    if len(query) <= TRIVIAL_QUERY_MAX_LENGTH and TRIVIAL_QUERY_PATTERN.match(query.strip()):
+        return
+    
+    context_retriever = get_context_retriever()
+    with _context_prefetches_lock:
+        if query in _context_prefetches:
+            return
+        future = _context_prefetch_executor.submit(context_retriever.retrieve_context, query, 5)
+        _context_prefetches[query] = future
+    
+    def _forget(done: Future) -> None:
+        with _context_prefetches_lock:
+            if _context_prefetches.get(query) is done:
+                del _context_prefetches[query]
+    
+    future.add_done_callback(_forget)
+
+
+@lru_cache(maxsize=4096)
+def _classify_cached(processed_query: str) -> tuple:
+    """
+    Classify a normalized query, memoized per query string. Classification runs at
+    temperature 0, so repeat queries reuse the earlier result instead of another
+    model call. Failures raise and are not cached.
+    
+    Args:
+        processed_query: The normalized query
         
-        return {
-            "processed_query": processed_query
-        }
+    Returns:
+        Tuple of (is_rag_required, is_prev_memory_required)
+    """
+    classification = get_intent_classifier().classify(processed_query)
+    return classification["is_rag_required"], classification["is_prev_memory_required"]
 
 
 def intent_classifier_node(state: QueryState) -> QueryState:
@@ -97,19 +262,19 @@ def intent_classifier_node(state: QueryState) -> QueryState:
     Returns:
         Updated state with is_rag_required and is_prev_memory_required set
     """
-    # intent_classifier = IntentClassifier()
-    classification = intent_classifier.classify(state["processed_query"])
+    # Classifies the normalized query, since it runs in parallel with optimization
+    is_rag_required, is_prev_memory_required = _classify_cached(state["processed_query"])
     
     return {
-        "is_rag_required": classification["is_rag_required"],
-        "is_prev_memory_required": classification["is_prev_memory_required"]
+        "is_rag_required": is_rag_required,
+        "is_prev_memory_required": is_prev_memory_required
     }
 
 
 def get_memory_node(state: QueryState) -> QueryState:
     """
     Node function that retrieves past conversation history for the user.
-    If memory is already in state (from process_query_node), skips RDS fetch.
+    If memory is already in state (from optimize_query_node), skips RDS fetch.
     
     Args:
         state: The current state containing user_id and potentially memory
@@ -121,7 +286,7 @@ def get_memory_node(state: QueryState) -> QueryState:
     existing_memory = state.get("memory", "")
     
     if existing_memory:
-        # Memory already retrieved in process_query_node, no need to fetch again
+        # Memory already retrieved in optimize_query_node, no need to fetch again
         return {}
     
     # Get user_id from state
@@ -135,7 +300,7 @@ def get_memory_node(state: QueryState) -> QueryState:
     
     try:
         # Retrieve past conversations for the user
-        past_conversations = memory_retriever.get_past_conversations(user_id)
+        past_conversations = get_memory_retriever().get_past_conversations(user_id)
         
         return {
             "memory": past_conversations
@@ -146,11 +311,21 @@ def get_memory_node(state: QueryState) -> QueryState:
         return {
             "memory": ""
         }
-    finally:
-        # Clean up the database connection
-        memory_retriever.close_connection()
 
 
+async def aget_memory_node(state: QueryState) -> QueryState:
+    """
+    Async variant of get_memory_node used when the DAG runs with ainvoke.
+    The database query runs in a worker thread so it overlaps with get_context.
+    
+    Args:
+        state: The current state containing user_id and potentially memory
+    
+    Returns:
+        Updated state with memory containing past conversation history
+    """
+    return await asyncio.to_thread(get_memory_node, state)
+
 
 def get_context_node(state: QueryState) -> QueryState:
     """
@@ -162,12 +337,20 @@ def get_context_node(state: QueryState) -> QueryState:
     Returns:
         Updated state with context retrieved from vector database
     """
-    # Initialize context retriever
-    # context_retriever = ContextRetriever()
+    # Reuse a speculative retrieval of the same query that is still running
+    with _context_prefetches_lock:
+        prefetch = _context_prefetches.get(state["processed_query"])
+    contexts = None
+    if prefetch is not None:
+        try:
+            contexts = prefetch.result()
+        except Exception:
+            contexts = None
     
     # Retrieve context using the processed query
     # retrieve_context returns a list of context strings
-    contexts = context_retriever.retrieve_context(state["processed_query"], top_k=5)
+    if contexts is None:
+        contexts = get_context_retriever().retrieve_context(state["processed_query"], top_k=5)
     
     # Join the list of contexts into a single string
     # Use newlines to separate different context chunks
@@ -178,31 +361,85 @@ def get_context_node(state: QueryState) -> QueryState:
     }
 
 
+async def aget_context_node(state: QueryState) -> QueryState:
+    """
+    Async variant of get_context_node used when the DAG runs with ainvoke.
+    Embedding and the vector search run in a worker thread so they overlap with get_memory.
+    
+    Args:
+        state: The current state containing the processed query
+        
+    Returns:
+        Updated state with context retrieved from vector database
+    """
+    return await asyncio.to_thread(get_context_node, state)
+
+
 def llm_orchestrator_node(state: QueryState) -> QueryState:
     """
     Node function that generates an LLM response using the query, context, and memory.
     
+    The response is streamed from the LLM. When the DAG runs with stream_mode="custom",
+    a metadata event and then each token are written to the stream as they arrive;
+    otherwise the writer is a no-op and only the final state is used.
+    
     Args:
         state: The current state containing query, context, and memory
         
     Returns:
         Updated state with llm_response added
     """
-    # Get the query, context, and memory from state
-    query = state.get("query", "")
+    writer = get_stream_writer()
+    writer(_stream_metadata(state))
+    
+    # Handle None or empty strings appropriately
     context = state.get("context", "")
     memory = state.get("memory", "")
     
-    # Generate response using LLMOrchestrator
-    # Handle None or empty strings appropriately
-    response = llm_orchestrator.generate_response(
-        query=query,
+    tokens = []
+    for token in get_orchestrator_llm().generate_response_stream(
+        query=state.get("query", ""),
         context=context if context else None,
-        past_conversation=memory if memory else None
-    )
+        past_conversation=memory if memory else None,
+        model=select_model(state)
+    ):
+        tokens.append(token)
+        writer({"type": "token", "data": token})
     
     return {
-        "llm_response": response
+        "llm_response": "".join(tokens)
+    }
+
+
+async def allm_orchestrator_node(state: QueryState) -> QueryState:
+    """
+    Async variant of llm_orchestrator_node used when the DAG runs with ainvoke/astream.
+    Streams the response with AsyncOpenAI so no thread is held while waiting on tokens.
+    
+    Args:
+        state: The current state containing query, context, and memory
+        
+    Returns:
+        Updated state with llm_response added
+    """
+    writer = get_stream_writer()
+    writer(_stream_metadata(state))
+    
+    context = state.get("context", "")
+    memory = state.get("memory", "")
+    
+    tokens = []
+    async for token in get_orchestrator_llm().agenerate_response_stream(
+        query=state.get("query", ""),
+        context=context if context else None,
+        past_conversation=memory if memory else None,
+        model=select_model(state)
+    ):
+        tokens.append(token)
+        writer({"type": "token", "data": token})
+    
+    return {
+        "llm_response": "".join(tokens)
     }
 
 
@@ -218,40 +455,40 @@ def logger_node(state: QueryState) -> QueryState:
         State unchanged (returns empty dict to maintain state as-is)
     """
     try:
-        # Get user_id, query, and llm_response from state
-        user_id = state.get("user_id")
-        query = state.get("query", "")
-        llm_response = state.get("llm_response", "")
-        
-        # Save conversation to conversation_history table
-        if user_id is not None and query and llm_response:
-            logger.save_conversation(user_id, query, llm_response)
-        
-        # Prepare state for logs table (maps user_id -> u_id and memory -> past_memory)
-        logs_state = {
-            "u_id": state.get("user_id"),
-            "query": state.get("query", ""),
-            "processed_query": state.get("processed_query", ""),
-            "context": state.get("context", ""),
-            "past_memory": state.get("memory", ""),
-            "llm_response": state.get("llm_response", "")
-        }
-        
-        # Save logs to logs table
-        logger.save_logs(logs_state)
+        # Queue the conversation_history and logs rows for the background writer
+        # (memory is stored as past_memory in the logs table)
+        get_async_logger().save_all(
+            user_id=state.get("user_id"),
+            query=state.get("query", ""),
+            processed_query=state.get("processed_query", ""),
+            context=state.get("context", ""),
+            past_memory=state.get("memory", ""),
+            llm_response=state.get("llm_response", "")
+        )
         
     except Exception as e:
         # If there's an error logging, we don't want to fail the workflow
         # In production, you might want to log this error to a separate error log
         pass
-    finally:
-        # Clean up the database connection
-        logger.close_connection()
     
     # Return empty dict to maintain state as-is
     return {}
 
 
+def merge_node(state: QueryState) -> QueryState:
+    """
+    Join node that waits for both intent classification and query optimization
+    before routing.
+    
+    Args:
+        state: The current state with classification results and processed query
+        
+    Returns:
+        State unchanged (returns empty dict to maintain state as-is)
+    """
+    return {}
+
+
 def route_after_classification(state: QueryState) -> Union[str, list[str]]:
     """
     Conditional routing function that determines which nodes to execute
@@ -295,21 +532,28 @@ def create_dag():
     
     # Add nodes
     workflow.add_node("process_query", process_query_node)
+    workflow.add_node("optimize_query", optimize_query_node)
     workflow.add_node("intent_classifier", intent_classifier_node)
-    workflow.add_node("get_memory", get_memory_node)
-    workflow.add_node("get_context", get_context_node)
-    workflow.add_node("llm_orchestrator", llm_orchestrator_node)
+    workflow.add_node("merge", merge_node)
+    # Retrieval nodes carry an async variant so ainvoke overlaps their I/O
+    workflow.add_node("get_memory", RunnableLambda(get_memory_node, afunc=aget_memory_node))
+    workflow.add_node("get_context", RunnableLambda(get_context_node, afunc=aget_context_node))
+    workflow.add_node("llm_orchestrator", RunnableLambda(llm_orchestrator_node, afunc=allm_orchestrator_node))
     workflow.add_node("logger", logger_node)
     
-    # Define the flow: START -> process_query -> intent_classifier -> (conditional routing)
+    # Define the flow: START -> process_query -> (intent_classifier || optimize_query) -> merge
+    # Classification and memory retrieval + optimization are independent, so they run in parallel
+    # (optimize_query starts a background context prefetch that merge doesn't wait for)
     workflow.add_edge(START, "process_query")
     workflow.add_edge("process_query", "intent_classifier")
+    workflow.add_edge("process_query", "optimize_query")
+    workflow.add_edge(["intent_classifier", "optimize_query"], "merge")
     
-    # Conditional routing after intent classification
+    # Conditional routing after both branches have finished
     # Routes to get_memory and/or get_context based on flags, or llm_orchestrator if neither is needed
     # When both flags are true, both nodes execute in parallel
     workflow.add_conditional_edges(
-        "intent_classifier",
+        "merge",
         route_after_classification,
         {
             "get_memory": "get_memory",
@@ -332,6 +576,77 @@ def create_dag():
     return app
 
 
+@lru_cache(maxsize=1)
+def get_app():
+    """
+    Get the compiled query processing DAG, building it on first use.
+    
+    The compiled graph is stateless between invocations, so one instance
+    is shared by all requests in the process.
+    
+    Returns:
+        Compiled LangGraph workflow
+    """
+    return create_dag()
+
+
+def warmup() -> None:
+    """
+    Build the pipeline ahead of the first request so it does not pay cold-start costs:
+    compiles the DAG, loads the embedding model and runs one forward pass, issues a
+    tiny Pinecone query (connection setup and index caches), and opens a pooled
+    database connection with SELECT 1.
+    
+    Failures are printed and ignored; the same work then happens on first use.
+    """
+    get_app()
+    get_query_processor()
+    get_intent_classifier()
+    get_orchestrator_llm()
+    get_async_logger()
+    
+    try:
+        get_context_retriever().retrieve_context("warmup", top_k=1)
+    except Exception as e:
+        print(f"Warning: Context retriever warmup failed: {str(e)}")
+    
+    try:
+        with get_connection_manager().connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except Exception as e:
+        print(f"Warning: Database warmup failed: {str(e)}")
+
+
+# Initial DAG state; copied per request with query and user_id filled in
+_INITIAL_STATE_TEMPLATE = {
+    "query": "",
+    "processed_query": "",  # Will be populated by the processing node
+    "is_rag_required": False,  # Will be set by the intent classifier
+    "is_prev_memory_required": False,  # Will be set by the intent classifier
+    "user_id": 0,  # User ID for memory retrieval
+    "context": "", # Will be populated by the context node
+    "memory": "", # Will be populated by the memory node
+    "llm_response": "", # Will be populated by the llm_orchestrator node
+}
+
+
+def _initial_state(query: str, user_id: int) -> dict:
+    """
+    Build the initial DAG state for a query.
+    
+    Args:
+        query: The input query string to process
+        user_id: The user ID for retrieving conversation history
+        
+    Returns:
+        Initial state dictionary
+    """
+    state = _INITIAL_STATE_TEMPLATE.copy()
+    state["query"] = query
+    state["user_id"] = user_id
+    return state
+
+
 def run_ka_dag(query: str, user_id: int) -> dict:
     """
     Callable function to trigger the query processing DAG.
@@ -343,119 +658,121 @@ def run_ka_dag(query: str, user_id: int) -> dict:
     Returns:
         Dictionary containing the final state with query and processed_query
     """
-    # Create the DAG
-    app = create_dag()
-    
-    # Initial state
-    initial_state = {
-        "query": query,
-        "processed_query": "",  # Will be populated by the processing node
-        "is_rag_required": False,  # Will be set by the intent classifier
-        "is_prev_memory_required": False,  # Will be set by the intent classifier
-        "user_id": user_id,  # User ID for memory retrieval
-        "context": "", # Will be populated by the context node
-        "memory": "", # Will be populated by the memory node
-        "llm_response": "", # Will be populated by the llm_orchestrator node
-    }
-    
-    # Run the workflow
-    result = app.invoke(initial_state)
-    
-    return result
+    # Run the compiled DAG (built once per process)
+    return get_app().invoke(_initial_state(query, user_id))
 
 
-def run_ka_dag_stream(query: str, user_id: int) -> Iterator[dict]:
+async def arun_ka_dag(query: str, user_id: int) -> dict:
     """
-    Callable function to trigger the query processing DAG with streaming LLM response.
+    Async version of run_ka_dag for use inside an event loop.
     
-    This function processes the query up to the LLM generation step, then streams
-    the response token by token instead of waiting for the complete response.
+    Runs the DAG with ainvoke: blocking nodes are executed in worker threads and
+    get_memory/get_context use their async variants, so the event loop is never
+    blocked and the two retrievals overlap.
     
     Args:
         query: The input query string to process
         user_id: The user ID for retrieving conversation history
         
-    Yields:
-        Dictionary chunks containing streaming response data:
-        - {"type": "metadata", "data": {...}} - Query processing metadata
-        - {"type": "token", "data": "..."} - Individual tokens from LLM
-        - {"type": "done", "data": {}} - Stream completion signal
+    Returns:
+        Dictionary containing the final state with query and processed_query
     """
-    # Initial state
-    state = {
-        "query": query,
-        "processed_query": "",
-        "is_rag_required": False,
-        "is_prev_memory_required": False,
-        "user_id": user_id,
-        "context": "",
-        "memory": "",
-        "llm_response": "",
-    }
-    
-    # Process query
-    state.update(process_query_node(state))
-    
-    # Classify intent
-    state.update(intent_classifier_node(state))
-    
-    # Get memory if needed
-    if state.get("is_prev_memory_required", False):
-        state.update(get_memory_node(state))
-    
-    # Get context if needed
-    if state.get("is_rag_required", False):
-        state.update(get_context_node(state))
+    return await get_app().ainvoke(_initial_state(query, user_id))
+
+
+def _stream_metadata(state: dict) -> dict:
+    """
+    Build the metadata event sent before the streamed tokens.
     
-    # First, yield metadata about the query processing
-    yield {
+    Args:
+        state: DAG state at the start of LLM generation
+        
+    Returns:
+        Metadata event dictionary
+    """
+    return {
         "type": "metadata",
         "data": {
-            "query": state.get("query", query),
+            "query": state.get("query"),
             "processed_query": state.get("processed_query"),
             "context_used": state.get("is_rag_required", False),
             "memory_used": state.get("is_prev_memory_required", False)
         }
     }
+
+
+def run_ka_dag_stream(query: str, user_id: int) -> Iterator[dict]:
+    """
+    Callable function to trigger the query processing DAG with streaming LLM response.
     
-    # Stream LLM response
-    query_text = state.get("query", "")
-    context_text = state.get("context", "")
-    memory_text = state.get("memory", "")
+    The compiled DAG runs with stream_mode="custom": llm_orchestrator_node writes a
+    metadata event and then the response token by token, and the logger node runs
+    once generation has finished.
     
-    full_response = ""
+    Args:
+        query: The input query string to process
+        user_id: The user ID for retrieving conversation history
+        
+    Yields:
+        Dictionary chunks containing streaming response data:
+        - {"type": "metadata", "data": {...}} - Query processing metadata
+        - {"type": "token", "data": "..."} - Individual tokens from LLM
+        - {"type": "done", "data": {}} - Stream completion signal
+    """
+    generating = False
     try:
-        for token in llm_orchestrator.generate_response_stream(
-            query=query_text,
-            context=context_text if context_text else None,
-            past_conversation=memory_text if memory_text else None
-        ):
-            full_response += token
-            yield {
-                "type": "token",
-                "data": token
-            }
+        for chunk in get_app().stream(_initial_state(query, user_id), stream_mode="custom"):
+            generating = True
+            yield chunk
     except Exception as e:
-        # Yield error if streaming fails
+        # Failures before generation propagate; once tokens are flowing, report in-stream
+        if not generating:
+            raise
         yield {
             "type": "error",
             "data": {"message": str(e)}
         }
         return
     
-    # Update state with full response for logging
-    state["llm_response"] = full_response
+    # Yield final message
+    yield {
+        "type": "done",
+        "data": {}
+    }
+
+
+async def arun_ka_dag_stream(query: str, user_id: int) -> AsyncIterator[dict]:
+    """
+    Async variant of run_ka_dag_stream for use inside an event loop.
+    
+    The DAG runs with astream: blocking steps run in worker threads and the LLM
+    response is streamed with AsyncOpenAI, so concurrent requests do not each hold
+    a thread while waiting on tokens.
     
-    # Log the conversation (run logger node)
+    Args:
+        query: The input query string to process
+        user_id: The user ID for retrieving conversation history
+        
+    Yields:
+        Dictionary chunks in the same format as run_ka_dag_stream
+    """
+    generating = False
     try:
-        logger_node(state)
+        async for chunk in get_app().astream(_initial_state(query, user_id), stream_mode="custom"):
+            generating = True
+            yield chunk
     except Exception as e:
-        # Don't fail if logging fails, but log the error
-        print(f"Warning: Failed to log conversation: {e}")
+        # Failures before generation propagate; once tokens are flowing, report in-stream
+        if not generating:
+            raise
+        yield {
+            "type": "error",
+            "data": {"message": str(e)}
+        }
+        return
     
     # Yield final message
     yield {
         "type": "done",
         "data": {}
     }
-
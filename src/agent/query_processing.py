@@ -1,6 +1,6 @@
 import dspy
-from typing import Optional
-from .memory_retriever import MemoryRetriever
+from typing import List, Optional
+from .memory_retriever import get_memory_retriever
 from dspy import Signature, InputField, OutputField
 
 
@@ -33,7 +33,7 @@ class QueryProcessor:
         """
         Initialize the QueryProcessor with memory retriever and LLM for optimization.
         """
-        self.memory_retriever = MemoryRetriever()
+        self.memory_retriever = get_memory_retriever()
         self._llm = None
         self._optimization_model = None
     
@@ -59,25 +59,25 @@ class QueryProcessor:
         Returns:
             String with normalized whitespace
         """
-        # Remove leading and trailing whitespace
-        text = text.strip()
-        # Collapse multiple spaces into single space
-        import re
-        text = re.sub(r'\s+', ' ', text)
-        return text
+        # split() with no separator drops leading/trailing whitespace and
+        # splits on runs of whitespace, so the join collapses them to one space
+        return " ".join(text.split())
     
     def _initialize_llm(self):
         """
         Initialize the LLM for query optimization using DSPy.
         Uses GPT-4o model similar to LLMOrchestrator.
         
+        The LM is applied per call with dspy.context rather than dspy.configure,
+        since optimization runs on DAG worker threads and DSPy only allows the
+        global settings to be changed from the thread that first set them.
+        
         Returns:
-            Configured DSPy language model
+            DSPy language model
         """
         if self._llm is None:
             from dspy import LM
             self._llm = LM("openai/gpt-4o")
-            dspy.configure(lm=self._llm)
         return self._llm
     
     def _get_optimization_model(self):
@@ -88,7 +88,6 @@ class QueryProcessor:
             Configured dspy.Predict model with QueryOptimizationSignature
         """
         if self._optimization_model is None:
-            self._initialize_llm()
             self._optimization_model = dspy.Predict(QueryOptimizationSignature)
         return self._optimization_model
     
@@ -124,11 +123,12 @@ class QueryProcessor:
             )
             
             # Call the optimization model
-            result = model(
-                processed_query=processed_query,
-                past_conversations=past_conversations if past_conversations else "No previous conversation.",
-                optimization_instructions=optimization_instructions
-            )
+            with dspy.context(lm=self._initialize_llm()):
+                result = model(
+                    processed_query=processed_query,
+                    past_conversations=past_conversations if past_conversations else "No previous conversation.",
+                    optimization_instructions=optimization_instructions
+                )
             
             optimized = result.optimized_query.strip()
             
@@ -160,39 +160,80 @@ class QueryProcessor:
             If return_memory is True: Tuple of (processed_query, past_conversations)
                                      past_conversations will be empty string if not retrieved
         """
-        if not isinstance(query, str):
-            raise TypeError("Input must be a string")
-        
-        # Step 1: Convert to lowercase
-        processed = self.to_lowercase(query)
-        
-        # Step 2: Normalize whitespace
-        processed = self.normalize_whitespace(processed)
+        # Steps 1-2: Lowercase and normalize whitespace
+        processed = self.normalize(query)
         
         past_conversations = ""
         
         # Step 3: Optimize query using LLM and past conversations (if user_id provided and optimize=True)
         if optimize and user_id is not None:
-            try:
-                # Retrieve past conversations
-                past_conversations = self.memory_retriever.get_past_conversations(user_id)
-                
-                # Optimize the query
-                processed = self.optimize_query(processed, past_conversations)
-                
-            except Exception as e:
-                # If optimization fails, continue with the processed query
-                print(f"Warning: Failed to optimize query with past conversations: {str(e)}")
-            finally:
-                # Note: We don't close the connection here if return_memory is True,
-                # as the connection might be needed elsewhere. The caller should handle cleanup.
-                if not return_memory:
-                    try:
-                        self.memory_retriever.close_connection()
-                    except:
-                        pass
+            processed, past_conversations = self.optimize_with_memory(processed, user_id)
         
         if return_memory:
             return processed, past_conversations
         return processed
+    
+    def normalize(self, query: str) -> str:
+        """
+        Apply the normalization steps (lowercase, whitespace) without LLM optimization.
+        
+        Args:
+            query: Input query string to process
+            
+        Returns:
+            Normalized query string
+            
+        Raises:
+            TypeError: If query is not a string
+        """
+        if not isinstance(query, str):
+            raise TypeError("Input must be a string")
+        
+        # Fast path: already lowercase with single interior spaces. isprintable() rules
+        # out every whitespace character except the ASCII space, so no new string is needed.
+        if (query.islower() and query.isprintable() and "  " not in query
+                and not query.startswith(" ") and not query.endswith(" ")):
+            return query
+        
+        # Steps 1-2 fused: lowercase, then trim and collapse whitespace in one split/join
+        return " ".join(query.lower().split())
+    
+    def process_batch(self, texts: List[str]) -> List[str]:
+        """
+        Apply the normalization steps (lowercase, whitespace) to many texts at once,
+        e.g. document paragraphs or chunks during ingestion. Never calls the LLM.
+        
+        Args:
+            texts: List of strings to process
+            
+        Returns:
+            List of normalized strings, in the same order
+        """
+        return [" ".join(text.lower().split()) for text in texts]
+    
+    def optimize_with_memory(self, processed_query: str, user_id: int) -> tuple:
+        """
+        Retrieve the user's past conversations and use them to optimize a normalized query.
+        
+        Args:
+            processed_query: The normalized query
+            user_id: User ID for retrieving past conversations
+            
+        Returns:
+            Tuple of (optimized_query, past_conversations). On failure the normalized
+            query is returned unchanged, with whatever memory was retrieved.
+        """
+        past_conversations = ""
+        try:
+            # Retrieve past conversations
+            past_conversations = self.memory_retriever.get_past_conversations(user_id)
+            
+            # Optimize the query
+            processed_query = self.optimize_query(processed_query, past_conversations)
+            
+        except Exception as e:
+            # If optimization fails, continue with the processed query
+            print(f"Warning: Failed to optimize query with past conversations: {str(e)}")
+        
+        return processed_query, past_conversations
 
@@ -0,0 +1,131 @@
+import hashlib
+import numpy as np
+from threading import Lock
+from typing import Callable, Optional, Tuple
+
+
+class SemanticCache:
+    """
+    In-process semantic cache for LLM answers.
+
+    Entries are keyed by the query embedding plus a hash of the exact context, past
+    conversation and model the answer was generated from. A lookup hits when an entry
+    with the same context/conversation hash has a query embedding whose cosine
+    similarity is at or above the threshold. Storage is a fixed-size ring buffer,
+    so the oldest entries are evicted first once capacity is reached.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[str], np.ndarray],
+        threshold: float = 0.92,
+        capacity: int = 10_000
+    ):
+        """
+        Initialize the SemanticCache.
+
+        Args:
+            embed_fn: Function mapping a query string to a 1-D embedding vector
+            threshold: Minimum cosine similarity for a cache hit
+            capacity: Maximum number of cached answers
+        """
+        self._embed_fn = embed_fn
+        self.threshold = threshold
+        self.capacity = capacity
+        self._lock = Lock()
+
+        # Allocated on first insert, once the embedding dimension is known
+        self._vectors = None
+        self._partitions = np.zeros(capacity, dtype=np.int64)
+        self._answers = [None] * capacity
+        self._size = 0
+        self._next = 0
+
+    @staticmethod
+    def _partition_key(context: str, past_conversation: str, model: str) -> int:
+        """
+        Hash the context, past conversation and model into a 64-bit partition key.
+
+        Args:
+            context: Retrieved context ("" if none)
+            past_conversation: Past conversation history ("" if none)
+            model: Model that generates the answer
+
+        Returns:
+            Signed 64-bit integer key
+        """
+        digest = hashlib.sha1(
+            model.encode("utf-8") + b"\0"
+            + context.encode("utf-8") + b"\0" + past_conversation.encode("utf-8")
+        ).digest()
+        return int.from_bytes(digest[:8], "little", signed=True)
+
+    def make_key(
+        self,
+        query: str,
+        context: str = "",
+        past_conversation: str = "",
+        model: str = ""
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Build the cache key for a query and the inputs its answer depends on.
+
+        Args:
+            query: The user's query
+            context: Retrieved context ("" if none)
+            past_conversation: Past conversation history ("" if none)
+            model: Model that generates the answer
+
+        Returns:
+            Tuple of (normalized query embedding, partition key)
+        """
+        vector = np.asarray(self._embed_fn(query), dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+        return vector, self._partition_key(context, past_conversation, model)
+
+    def lookup(self, key: Tuple[np.ndarray, int]) -> Optional[str]:
+        """
+        Find a cached answer for the given key.
+
+        Args:
+            key: Key returned by make_key
+
+        Returns:
+            The cached answer, or None on a miss
+        """
+        vector, partition = key
+        with self._lock:
+            if self._size == 0:
+                return None
+
+            candidates = np.flatnonzero(self._partitions[:self._size] == partition)
+            if candidates.size == 0:
+                return None
+
+            similarities = self._vectors[candidates] @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            return self._answers[candidates[best]]
+
+    def insert(self, key: Tuple[np.ndarray, int], answer: str) -> None:
+        """
+        Cache an answer under the given key, evicting the oldest entry if full.
+
+        Args:
+            key: Key returned by make_key
+            answer: The generated answer to cache
+        """
+        vector, partition = key
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+
+            slot = self._next
+            self._vectors[slot] = vector
+            self._partitions[slot] = partition
+            self._answers[slot] = answer
+            self._next = (slot + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
@@ -1,6 +1,11 @@
 import yaml
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
+# Use the libyaml C parser when PyYAML was built with it
+_YamlSafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 def load_config(config_path: str = None) -> dict:
     """
@@ -21,6 +26,53 @@ def load_config(config_path: str = None) -> dict:
         config_path = Path(config_path)
     
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=_YamlSafeLoader)
+    
+    return config
+
+
+# Parsed configs keyed by resolved path, validated against the file's (mtime, size)
+_CONFIG_CACHE_MAXSIZE = 100
+_config_cache = OrderedDict()
+_config_cache_lock = threading.Lock()
+
+
+def cached_load_config(config_path: str = None) -> dict:
+    """
+    Load configuration from YAML file, re-parsing it only when the file changes.
+    
+    Parsed configs are cached per path and reused while the file's modification
+    time and size are unchanged, so edits are picked up without a restart. The
+    returned dictionary is shared between callers and must not be modified.
+    
+    Args:
+        config_path: Path to the config file. If None, uses default path.
+        
+    Returns:
+        Dictionary containing configuration values
+    """
+    if config_path is None:
+        # Get the project root directory (parent of src)
+        project_root = Path(__file__).parent.parent.parent
+        config_path = project_root / "configs" / "backend_config.yaml"
+    
+    path = Path(config_path).resolve()
+    key = str(path)
+    stat = path.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    
+    with _config_cache_lock:
+        cached = _config_cache.get(key)
+        if cached is not None and cached[0] == signature:
+            _config_cache.move_to_end(key)
+            return cached[1]
+    
+    config = load_config(key)
+    
+    with _config_cache_lock:
+        _config_cache[key] = (signature, config)
+        _config_cache.move_to_end(key)
+        if len(_config_cache) > _CONFIG_CACHE_MAXSIZE:
+            _config_cache.popitem(last=False)
     
     return config
@@ -2,21 +2,42 @@
 User management for authentication and user operations.
 """
 import os
+import hashlib
+import logging
+import threading
 import psycopg2
 from typing import Optional, Dict
-import warnings
 import sys
 from pathlib import Path
+from cachetools import TTLCache
 
 # Add the src directory to the path to import agent modules
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root / "src"))
 
-from agent.db_connection_manager import get_connection_manager
+from agent.db_connection_manager import get_connection_manager, execute_prepared
 
-# Suppress bcrypt version warnings
-warnings.filterwarnings("ignore", category=UserWarning, module="passlib")
-warnings.filterwarnings("ignore", message=".*bcrypt.*")
+logger = logging.getLogger(__name__)
+
+# Successful password verifications are remembered for a short time so repeat
+# logins skip the bcrypt key schedule (~250ms at cost 12).
+AUTH_CACHE_MAXSIZE = 10000
+AUTH_CACHE_TTL_SECONDS = 300
+
+# Hot user queries, run as server-side prepared statements (parsed and planned
+# once per pooled connection).
+REGISTER_USER_SQL = """
+    INSERT INTO users (email, password_hash, full_name)
+    VALUES ($1, $2, $3)
+    ON CONFLICT (email) DO NOTHING
+    RETURNING id, email, full_name, created_at
+"""
+USER_BY_EMAIL_SQL = """
+    SELECT id, email, password_hash, full_name FROM users WHERE email = $1
+"""
+USER_BY_ID_SQL = """
+    SELECT id, email, full_name, created_at FROM users WHERE id = $1
+"""
 
 
 class UserManager:
@@ -25,16 +46,37 @@ class UserManager:
     def __init__(self):
         """Initialize the UserManager with database connection manager."""
         self._connection_manager = get_connection_manager()
+        self._auth_cache = TTLCache(maxsize=AUTH_CACHE_MAXSIZE, ttl=AUTH_CACHE_TTL_SECONDS)
+        self._auth_cache_lock = threading.Lock()
+    
+    @staticmethod
+    def _auth_cache_key(password_hash: str, password: str) -> bytes:
+        """
+        Build the verification cache key for a stored hash and a submitted password.
+        
+        The key is SHA-256 over the stored bcrypt hash (which embeds the salt) and
+        the submitted password, so a password change produces a new stored hash and
+        naturally invalidates old entries.
+        
+        Security trade-off: while an entry is live, a SHA-256 digest derived from the
+        plaintext password sits in process memory, and it is far cheaper to brute-force
+        than the bcrypt hash. Entries expire after AUTH_CACHE_TTL_SECONDS.
+        """
+        return hashlib.sha256(
+            password_hash.encode('utf-8') + b"\0" + password.encode('utf-8')
+        ).digest()
     
     def _get_db_connection(self):
-        """Get a database connection using the connection manager (with failover)."""
-        return self._connection_manager.get_connection()
+        """
+        Borrow a pooled database connection using the connection manager (with failover).
+        
+        Returns:
+            Context manager yielding a psycopg2 connection that is returned to the pool on exit
+        """
+        return self._connection_manager.connection()
     
     def create_user_table_if_not_exists(self):
         """Create the users table if it doesn't exist."""
-        conn = self._get_db_connection()
-        cursor = conn.cursor()
-        
         create_table_query = """
         CREATE TABLE IF NOT EXISTS users (
             id SERIAL PRIMARY KEY,
@@ -46,122 +88,94 @@ class UserManager:
         );
         """
         
-        cursor.execute(create_table_query)
-        conn.commit()
-        cursor.close()
+        with self._get_db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(create_table_query)
+            conn.commit()
     
     def register_user(self, email: str, password: str, full_name: Optional[str] = None) -> Dict:
         """Register a new user."""
         from .auth import get_password_hash
         
-        conn = self._get_db_connection()
-        cursor = conn.cursor()
+        # Hash password up front: the insert below checks for an existing
+        # email and creates the user in a single round trip, so a duplicate
+        # registration costs one wasted bcrypt hash instead of an extra query.
+        # Hashing before borrowing also keeps the pooled connection free meanwhile.
+        password_hash = get_password_hash(password)
         
-        try:
-            # Check if user already exists
-            cursor.execute("SELECT id FROM users WHERE email = %s", (email,))
-            if cursor.fetchone():
-                raise ValueError("User with this email already exists")
-            
-            # Hash password
-            print(f"DEBUG: Hashing password (length: {len(password)} chars, {len(password.encode('utf-8'))} bytes)")
-            password_hash = get_password_hash(password)
-            print("DEBUG: Password hashed successfully")
-            
-            # Insert new user
-            insert_query = """
-            INSERT INTO users (email, password_hash, full_name)
-            VALUES (%s, %s, %s)
-            RETURNING id, email, full_name, created_at
-            """
-            cursor.execute(insert_query, (email, password_hash, full_name))
+        # Borrow a pooled connection; rollback and return happen on exit
+        with self._get_db_connection() as conn, conn.cursor() as cursor:
+            # Insert new user unless the email is already registered
+            execute_prepared(
+                cursor, "register_user", REGISTER_USER_SQL,
+                (email, password_hash, full_name)
+            )
             result = cursor.fetchone()
+            if result is None:
+                raise ValueError("User with this email already exists")
             conn.commit()
-            
-            return {
-                "id": result[0],
-                "email": result[1],
-                "full_name": result[2],
-                "created_at": result[3].isoformat() if result[3] else None
-            }
-        except psycopg2.IntegrityError:
-            conn.rollback()
-            raise ValueError("User with this email already exists")
-        except Exception as e:
-            conn.rollback()
-            raise
-        finally:
-            cursor.close()
+        
+        return {
+            "id": result[0],
+            "email": result[1],
+            "full_name": result[2],
+            "created_at": result[3].isoformat() if result[3] else None
+        }
     
     def authenticate_user(self, email: str, password: str) -> Optional[Dict]:
         """Authenticate a user and return user data if successful."""
         from .auth import verify_password
         
-        conn = self._get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Get user by email
-            cursor.execute(
-                "SELECT id, email, password_hash, full_name FROM users WHERE email = %s",
-                (email,)
-            )
+        # Get user by email; the connection goes back to the pool before bcrypt runs
+        with self._get_db_connection() as conn, conn.cursor() as cursor:
+            execute_prepared(cursor, "user_by_email", USER_BY_EMAIL_SQL, (email,))
             result = cursor.fetchone()
-            
-            if not result:
-                return None
-            
-            user_id, user_email, password_hash, full_name = result
-            
-            # Verify password
+        
+        if not result:
+            return None
+        
+        user_id, user_email, password_hash, full_name = result
+        
+        # Verify password, skipping bcrypt if this exact password was
+        # verified against this exact stored hash recently
+        cache_key = self._auth_cache_key(password_hash, password)
+        with self._auth_cache_lock:
+            verified = cache_key in self._auth_cache
+        
+        if not verified:
             if not verify_password(password, password_hash):
                 return None
-            
-            return {
-                "id": user_id,
-                "email": user_email,
-                "full_name": full_name
-            }
-        finally:
-            cursor.close()
+            with self._auth_cache_lock:
+                self._auth_cache[cache_key] = True
+        
+        return {
+            "id": user_id,
+            "email": user_email,
+            "full_name": full_name
+        }
     
     def get_user_by_id(self, user_id: int) -> Optional[Dict]:
         """Get user by ID."""
         try:
-            conn = self._get_db_connection()
-            cursor = conn.cursor()
-            
-            try:
-                cursor.execute(
-                    "SELECT id, email, full_name, created_at FROM users WHERE id = %s",
-                    (user_id,)
-                )
+            # Borrow a pooled connection; it is returned to the pool on exit
+            with self._get_db_connection() as conn, conn.cursor() as cursor:
+                execute_prepared(cursor, "user_by_id", USER_BY_ID_SQL, (user_id,))
                 result = cursor.fetchone()
-                
-                if not result:
-                    print(f"DEBUG: No user found with ID: {user_id}")
-                    return None
-                
-                user_dict = {
-                    "id": result[0],
-                    "email": result[1],
-                    "full_name": result[2],
-                    "created_at": result[3].isoformat() if result[3] else None
-                }
-                print(f"DEBUG: User found: {user_dict.get('email', 'N/A')}")
-                return user_dict
-            finally:
-                cursor.close()
+            
+            if not result:
+                logger.debug("No user found with ID: %s", user_id)
+                return None
+            
+            user_dict = {
+                "id": result[0],
+                "email": result[1],
+                "full_name": result[2],
+                "created_at": result[3].isoformat() if result[3] else None
+            }
+            logger.debug("User found: %s", user_dict.get('email', 'N/A'))
+            return user_dict
         except psycopg2.Error as e:
-            print(f"DEBUG: Database error in get_user_by_id: {type(e).__name__}: {str(e)}")
+            logger.error("Database error in get_user_by_id: %s: %s", type(e).__name__, e)
             raise
         except Exception as e:
-            print(f"DEBUG: Unexpected error in get_user_by_id: {type(e).__name__}: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+            logger.exception("Unexpected error in get_user_by_id: %s: %s", type(e).__name__, e)
             raise
-    
-    def close_connection(self):
-        """Close the database connection."""
-        self._connection_manager.close_connection()
-
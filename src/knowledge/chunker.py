@@ -4,7 +4,10 @@ Text Chunker Module
 This module provides the Chunker class for splitting text into chunks with overlap.
 """
 
-from typing import List
+from bisect import bisect_right
+from collections import deque
+from itertools import accumulate, repeat
+from typing import Iterable, Iterator, List, Optional
 
 
 class Chunker:
@@ -13,12 +16,38 @@ class Chunker:
     
     This class handles:
     - Splitting text into chunks of specified word size with overlap
+    - Capping chunks at the embedding model's token limit (when a tokenizer is given)
     - Chunking paragraphs into segments
     """
     
-    def __init__(self):
-        """Initialize the Chunker."""
-        pass
+    def __init__(self, tokenizer=None, max_tokens: int = 512):
+        """
+        Initialize the Chunker.
+        
+        Args:
+            tokenizer: Optional Hugging Face (fast) tokenizer of the embedding model. When given,
+                       chunks are also shortened so they fit in max_tokens tokens.
+            max_tokens: Maximum number of tokens per chunk, including special tokens (default: 512)
+        """
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+    
+    def _token_counts(self, words: List[str]) -> List[int]:
+        """
+        Count tokens per word with a single tokenizer call.
+        
+        Args:
+            words: List of words
+            
+        Returns:
+            List with the number of tokens of each word
+        """
+        encoding = self.tokenizer(words, add_special_tokens=False, is_split_into_words=True)
+        counts = [0] * len(words)
+        for word_id in encoding.word_ids():
+            if word_id is not None:
+                counts[word_id] += 1
+        return counts
     
     def chunk_text_with_overlap(
         self,
@@ -39,27 +68,43 @@ class Chunker:
         """
         # Split text into words
         words = text.split()
+        num_words = len(words)
+        
+        # Token budget per chunk (token counts are only known with a tokenizer)
+        cum_tokens: Optional[List[int]] = None
+        if self.tokenizer is not None and num_words:
+            # Prefix sums: words i..j-1 take cum_tokens[j] - cum_tokens[i] tokens
+            cum_tokens = [0, *accumulate(self._token_counts(words))]
+            token_budget = self.max_tokens - self.tokenizer.num_special_tokens_to_add()
         
-        if len(words) <= chunk_size:
-            # If text is smaller than chunk size, return as single chunk
+        if num_words == 0:
             return [text]
         
         chunks = []
         start_idx = 0
         
-        while start_idx < len(words):
+        while start_idx < num_words:
             # Get chunk of words
-            end_idx = min(start_idx + chunk_size, len(words))
-            chunk_words = words[start_idx:end_idx]
-            chunk_text = ' '.join(chunk_words)
-            chunks.append(chunk_text)
+            end_idx = min(start_idx + chunk_size, num_words)
+            if cum_tokens is not None:
+                # Binary search for the last word that still fits in the token budget
+                # (always keep at least one word)
+                max_end = bisect_right(cum_tokens, cum_tokens[start_idx] + token_budget) - 1
+                end_idx = max(min(end_idx, max_end), start_idx + 1)
+            
+            if start_idx == 0 and end_idx >= num_words:
+                # If text fits in a single chunk, return it as is
+                return [text]
             
-            # Move start index forward by (chunk_size - overlap) to create overlap
-            start_idx += (chunk_size - overlap)
+            chunk_text = ' '.join(words[start_idx:end_idx])
+            chunks.append(chunk_text)
             
             # If we're at the end, break
-            if end_idx >= len(words):
+            if end_idx >= num_words:
                 break
+            
+            # Start the next chunk overlap words before this one ends
+            start_idx = max(end_idx - overlap, start_idx + 1)
         
         return chunks
     
@@ -80,11 +125,66 @@ class Chunker:
         Returns:
             List of chunked text segments
         """
-        # Combine all paragraphs into one continuous text
-        combined_text = ' '.join(paragraphs)
+        return list(self.chunk_iter(paragraphs, chunk_size, overlap))
+    
+    def chunk_iter(
+        self,
+        paragraphs: Iterable[str],
+        chunk_size: int = 300,
+        overlap: int = 50
+    ) -> Iterator[str]:
+        """
+        Lazily chunk a stream of paragraphs as if they were one continuous text.
         
-        # Chunk the combined text
-        chunks = self.chunk_text_with_overlap(combined_text, chunk_size, overlap)
+        Yields the same chunks as chunk_text_with_overlap(' '.join(paragraphs)), but keeps
+        only a sliding window of words in memory instead of the combined text, so chunks
+        can be processed while later paragraphs are still being read.
         
-        return chunks
+        Args:
+            paragraphs: Iterable of paragraph strings
+            chunk_size: Number of words per chunk (default: 300)
+            overlap: Number of overlapping words between consecutive chunks (default: 50)
+            
+        Yields:
+            Chunked text segments
+        """
+        token_budget = None
+        if self.tokenizer is not None:
+            token_budget = self.max_tokens - self.tokenizer.num_special_tokens_to_add()
+        
+        window = deque()  # (word, number of tokens) of the current chunk
+        window_tokens = 0
+        new_words = 0  # Words in the window not yet part of a yielded chunk
+        head = []  # Paragraphs read before the first chunk, yielded as-is if it's the only one
+        
+        for paragraph in paragraphs:
+            if head is not None:
+                head.append(paragraph)
+            
+            words = paragraph.split()
+            counts = self._token_counts(words) if token_budget is not None and words else repeat(0)
+            
+            for word, num_tokens in zip(words, counts):
+                # Yield the window once the next word no longer fits
+                while window and (
+                    len(window) >= chunk_size
+                    or (token_budget is not None and window_tokens + num_tokens > token_budget)
+                ):
+                    yield ' '.join(w for w, _ in window)
+                    head = None
+                    new_words = 0
+                    
+                    # Keep the last overlap words (always drop at least one)
+                    for _ in range(max(len(window) - overlap, 1)):
+                        window_tokens -= window.popleft()[1]
+                
+                window.append((word, num_tokens))
+                window_tokens += num_tokens
+                new_words += 1
+        
+        if head is not None:
+            # Everything fit in one chunk: return the combined text as a single chunk
+            yield ' '.join(head)
+        elif new_words:
+            yield ' '.join(w for w, _ in window)
 
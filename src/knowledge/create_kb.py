@@ -7,15 +7,45 @@ chunking it, converting to embeddings, and storing in Pinecone vector database.
 
 import os
 import uuid
+import tempfile
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 import numpy as np
 from pinecone import Pinecone, ServerlessSpec
+from pypdf import PdfReader
 
 from src.agent.query_processing import QueryProcessor
 from src.agent.context_retriever import ContextRetriever
-from src.knowledge.knowledge_extractor import Extractor
+from src.agent.utils import cached_load_config
+from src.knowledge.knowledge_extractor import Extractor, split_pdf
 from src.knowledge.chunker import Chunker
+from src.knowledge.embedding_cache import EmbeddingCache
+
+# Maximum number of Pinecone upserts in flight while later batches are embedded
+UPSERT_CONCURRENCY = 4
+
+# Decimal places kept in uploaded vector values. Upserts are sent as JSON, so
+# shorter decimals cut the payload by more than half; at 5 places the cosine
+# error on normalized bge-m3 vectors is ~1e-8, below float16 rounding. Overridden by
+# embeddings.vector_decimals in the data ingestion config, which the DAG reads too.
+VECTOR_DECIMALS = 5
+
+# Data ingestion pipeline config shared with dags/data_ingestion_dag.py
+INGESTION_CONFIG_PATH = Path(__file__).parent.parent.parent / "configs" / "data_ingestion_config.yaml"
+
+# PDFs with more pages than this are split into parts of this many pages, which are
+# extracted in worker processes while earlier parts are chunked and embedded
+PAGES_PER_PART = 10
+
+# KnowledgeExtractor owned by the current extract_many worker process
+_worker_extractor = None
+
+# Extractor owned by the current PDF-part extraction worker process
+_part_extractor = None
 
 
 class KnowledgeExtractor:
@@ -34,7 +64,8 @@ class KnowledgeExtractor:
         self,
         pinecone_api_key: Optional[str] = None,
         pinecone_index_name: Optional[str] = None,
-        pinecone_environment: Optional[str] = None
+        pinecone_environment: Optional[str] = None,
+        embedding_cache_path: Optional[str] = None
     ):
         """
         Initialize the KnowledgeExtractor.
@@ -43,11 +74,14 @@ class KnowledgeExtractor:
             pinecone_api_key: Pinecone API key (defaults to PINECONE_API_KEY env var)
             pinecone_index_name: Pinecone index name (defaults to PINECONE_INDEX_NAME env var or "pdf-knowledge-base")
             pinecone_environment: Pinecone environment/region (defaults to PINECONE_ENVIRONMENT env var or "us-east-1")
+            embedding_cache_path: SQLite file caching chunk embeddings across runs (defaults to
+                                  EMBEDDING_CACHE_PATH env var; no cache if unset)
         """
         # Get configuration from parameters or environment variables
         self.pinecone_api_key = pinecone_api_key or os.getenv("PINECONE_API_KEY")
         self.pinecone_index_name = pinecone_index_name or os.getenv("PINECONE_INDEX_NAME", "pdf-knowledge-base")
         self.pinecone_environment = pinecone_environment or os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
+        self.embedding_cache_path = embedding_cache_path or os.getenv("EMBEDDING_CACHE_PATH")
         
         if not self.pinecone_api_key:
             raise ValueError(
@@ -65,11 +99,22 @@ class KnowledgeExtractor:
         self.query_processor = QueryProcessor()
         self.context_retriever = ContextRetriever()
         
+        # Decimal places of uploaded vector values, matching the ingestion DAG
+        self.vector_decimals = VECTOR_DECIMALS
+        if INGESTION_CONFIG_PATH.exists():
+            embeddings_config = cached_load_config(str(INGESTION_CONFIG_PATH)).get("embeddings", {})
+            self.vector_decimals = embeddings_config.get("vector_decimals", VECTOR_DECIMALS)
+        
+        # Initialize embedding cache (unchanged chunks are not re-embedded on re-ingest)
+        self.embedding_cache = None
+        if self.embedding_cache_path:
+            self.embedding_cache = EmbeddingCache(self.embedding_cache_path, self.context_retriever.model_id)
+        
         # Initialize PDF extractor
         self.extractor = Extractor()
         
-        # Initialize chunker
-        self.chunker = Chunker()
+        # Initialize chunker, capping chunks at the embedding model's token limit
+        self.chunker = Chunker(tokenizer=getattr(self.context_retriever.model, "tokenizer", None))
     
     def _initialize_pinecone_index(self):
         """
@@ -95,18 +140,71 @@ class KnowledgeExtractor:
         else:
             print(f"Index {self.pinecone_index_name} already exists")
         
-        # Connect to the index
-        index = self.pc.Index(self.pinecone_index_name)
+        # Connect to the index (the thread pool serves async_req upserts)
+        index = self.pc.Index(self.pinecone_index_name, pool_threads=UPSERT_CONCURRENCY)
         print(f"Connected to index: {self.pinecone_index_name}")
         
         return index
     
+    def _wait_for_upsert(self, pending: tuple, total_uploaded: int) -> int:
+        """
+        Wait for an asynchronous Pinecone upsert to finish.
+        
+        Args:
+            pending: Tuple of (async upsert result, number of vectors in the batch)
+            total_uploaded: Number of vectors uploaded before this batch
+            
+        Returns:
+            Number of vectors uploaded by this batch
+            
+        Raises:
+            Exception: If the upsert failed
+        """
+        result, num_vectors = pending
+        result.get()
+        print(f"Uploaded {num_vectors} vectors (Total: {total_uploaded + num_vectors})")
+        return num_vectors
+    
+    def _iter_paragraphs(self, pdf_path: Path, extract_workers: int) -> Iterator[str]:
+        """
+        Extract paragraphs from a PDF, yielding them in document order.
+        
+        PDFs longer than PAGES_PER_PART pages are split into parts that are extracted
+        in extract_workers worker processes. Paragraphs of a part are yielded as soon
+        as it and all earlier parts are done, so the caller can chunk and embed them
+        while later parts are still being extracted.
+        
+        Args:
+            pdf_path: Resolved path to the PDF file
+            extract_workers: Number of extraction worker processes (0 extracts the
+                             whole PDF in this process, without pipelining)
+            
+        Yields:
+            Extracted paragraph strings
+        """
+        reader = PdfReader(str(pdf_path))
+        if extract_workers < 1 or len(reader.pages) <= PAGES_PER_PART:
+            yield from self.extractor.extract(str(pdf_path))
+            return
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            part_paths = split_pdf(reader, PAGES_PER_PART, Path(tmp_dir))
+            print(f"Extracting {len(part_paths)} parts of {PAGES_PER_PART} pages with {extract_workers} worker(s)")
+            
+            executor = ProcessPoolExecutor(max_workers=extract_workers, mp_context=mp.get_context("spawn"))
+            try:
+                for part_paragraphs in executor.map(_extract_part, part_paths):
+                    yield from part_paragraphs
+            finally:
+                executor.shutdown(cancel_futures=True)
+    
     def extract(
         self,
         pdf_path: str,
         chunk_size: int = 300,
         overlap: int = 50,
-        batch_size: int = 100
+        batch_size: int = 100,
+        extract_workers: int = 1
     ) -> dict:
         """
         Main method to extract paragraphs from PDF, chunk them into segments,
@@ -117,6 +215,8 @@ class KnowledgeExtractor:
             chunk_size: Number of words per chunk (default: 300)
             overlap: Number of overlapping words between consecutive chunks (default: 50)
             batch_size: Number of chunks to process and upload in each batch (default: 100)
+            extract_workers: Number of worker processes extracting parts of long PDFs while
+                             earlier parts are embedded (default: 1; 0 disables pipelining)
             
         Returns:
             Dictionary with extraction results including:
@@ -144,12 +244,12 @@ class KnowledgeExtractor:
         print(f"PDF path: {pdf_path}")
         print("-" * 50)
         
-        # Step 1: Extract paragraphs from PDF using Extractor
+        # Step 1: Extract paragraphs from PDF using Extractor (lazily, see _iter_paragraphs)
         print("Step 1: Extracting paragraphs from PDF...")
-        paragraphs = self.extractor.extract(str(pdf_path))
-        print(f"Extracted {len(paragraphs)} paragraphs")
+        paragraph_stream = self._iter_paragraphs(pdf_path, extract_workers)
+        first_paragraph = next(paragraph_stream, None)
         
-        if len(paragraphs) == 0:
+        if first_paragraph is None:
             print("Warning: No paragraphs extracted from PDF. Exiting.")
             return {
                 "total_uploaded": 0,
@@ -158,70 +258,90 @@ class KnowledgeExtractor:
                 "num_chunks": 0
             }
         
-        # Step 2: Chunk paragraphs into segments of specified size with overlap
-        print(f"\nStep 2: Chunking paragraphs into {chunk_size}-word segments with {overlap}-word overlap...")
-        chunked_segments = self.chunker.chunk_paragraphs(paragraphs, chunk_size=chunk_size, overlap=overlap)
-        print(f"Created {len(chunked_segments)} chunks")
+        num_paragraphs = 0
         
-        # Step 3: Process chunks using QueryProcessor
-        print("\nStep 3: Processing chunks...")
-        processed_chunks = self.extractor.process_paragraphs(chunked_segments)
-        print(f"Processed {len(processed_chunks)} chunks")
+        def count_paragraphs(paragraphs):
+            nonlocal num_paragraphs
+            for paragraph in paragraphs:
+                num_paragraphs += 1
+                yield paragraph
         
-        # Step 4: Convert to embeddings using ContextRetriever
-        print("\nStep 4: Converting chunks to embeddings...")
+        # Steps 2-4 run batch by batch: chunks are produced lazily from the paragraphs,
+        # so only one batch of chunks is held in memory at a time
+        print(f"\nSteps 2-4: Chunking paragraphs into {chunk_size}-word segments with {overlap}-word overlap, "
+              f"processing them, and converting them to embeddings...")
+        chunk_stream = self.chunker.chunk_iter(
+            count_paragraphs(chain([first_paragraph], paragraph_stream)),
+            chunk_size=chunk_size,
+            overlap=overlap
+        )
         
-        # Process in batches to avoid memory issues
+        # Process in batches to avoid memory issues. Upserts run asynchronously so
+        # the next batch is embedded while earlier ones are uploading.
         total_uploaded = 0
-        num_batches = (len(processed_chunks) + batch_size - 1) // batch_size
+        num_chunks = 0
+        inflight = deque()
         
-        for batch_idx in range(num_batches):
-            start_idx = batch_idx * batch_size
-            end_idx = min((batch_idx + 1) * batch_size, len(processed_chunks))
-            batch_chunks = processed_chunks[start_idx:end_idx]
-            batch_original = chunked_segments[start_idx:end_idx]  # Keep original for storage
+        batch_idx = 0
+        while True:
+            # Take the next batch of chunks from the stream
+            batch_original = list(islice(chunk_stream, batch_size))  # Keep original for storage
+            if not batch_original:
+                break
+            start_idx = num_chunks
+            num_chunks += len(batch_original)
+            batch_idx += 1
+            
+            print(f"Processing batch {batch_idx} ({len(batch_original)} chunks)...")
             
-            print(f"Processing batch {batch_idx + 1}/{num_batches} ({len(batch_chunks)} chunks)...")
+            # Process chunks using QueryProcessor
+            batch_chunks = self.extractor.process_paragraphs(batch_original)
             
-            # Convert batch to embeddings
-            embeddings = self.context_retriever.convert_batch_to_embeddings(batch_chunks)
+            # Convert batch to embeddings (reusing cached embeddings of unchanged chunks)
+            if self.embedding_cache is not None:
+                embeddings = self.embedding_cache.embed(batch_chunks, self.context_retriever.convert_batch_to_embeddings)
+            else:
+                embeddings = self.context_retriever.convert_batch_to_embeddings(batch_chunks)
             
             # Ensure embeddings is a 2D numpy array
             if embeddings.ndim == 1:
                 embeddings = embeddings.reshape(1, -1)
             
-            # Step 5: Prepare vectors for Pinecone upload
-            vectors_to_upload = []
-            for i in range(len(batch_chunks)):
-                # Get embedding for this chunk (handle both 1D and 2D arrays)
-                if embeddings.ndim == 2:
-                    embedding = embeddings[i]
-                else:
-                    embedding = embeddings
-                
-                # Generate unique ID for each vector
-                vector_id = str(uuid.uuid4())
-                
-                # Prepare metadata
-                metadata = {
-                    "pdf_name": pdf_name,
-                    "chunk_index": start_idx + i,
-                    "text": batch_original[i],  # Store original text for retrieval
-                    "processed_text": batch_chunks[i]  # Store processed text for reference
+            # Convert the whole batch to nested lists in one call (one row per chunk),
+            # rounded in float64 so the values serialize as short decimals
+            embedding_lists = np.round(embeddings.astype(np.float64), self.vector_decimals).tolist()
+            
+            # Step 5: Prepare vectors for Pinecone upload (one unique ID per vector)
+            vectors_to_upload = [
+                {
+                    "id": uuid.uuid4().hex,
+                    "values": values,
+                    "metadata": {
+                        "pdf_name": pdf_name,
+                        "chunk_index": start_idx + i,
+                        "text": original_text,  # Store original text for retrieval
+                        "processed_text": processed_text  # Store processed text for reference
+                    }
                 }
-                
-                vectors_to_upload.append({
-                    "id": vector_id,
-                    "values": embedding.tolist(),  # Convert numpy array to list
-                    "metadata": metadata
-                })
+                for i, (values, original_text, processed_text)
+                in enumerate(zip(embedding_lists, batch_original, batch_chunks))
+            ]
             
-            # Upload batch to Pinecone
-            print(f"Uploading batch {batch_idx + 1} to Pinecone...")
-            self.index.upsert(vectors=vectors_to_upload)
-            total_uploaded += len(vectors_to_upload)
-            print(f"Uploaded {len(vectors_to_upload)} vectors (Total: {total_uploaded})")
+            # Upload batch to Pinecone, waiting for the oldest upload if too many are in flight
+            if len(inflight) >= UPSERT_CONCURRENCY:
+                total_uploaded += self._wait_for_upsert(inflight.popleft(), total_uploaded)
+            print(f"Uploading batch {batch_idx} to Pinecone...")
+            inflight.append((
+                self.index.upsert(vectors=vectors_to_upload, async_req=True),
+                len(vectors_to_upload)
+            ))
+        
+        # Wait for the remaining uploads
+        while inflight:
+            total_uploaded += self._wait_for_upsert(inflight.popleft(), total_uploaded)
         
+        print(f"Extracted {num_paragraphs} paragraphs")
+        print(f"Created and processed {num_chunks} chunks")
         print("\n" + "=" * 50)
         print(f"Successfully uploaded {total_uploaded} vectors to Pinecone!")
         print(f"PDF: {pdf_name}")
@@ -231,7 +351,130 @@ class KnowledgeExtractor:
         return {
             "total_uploaded": total_uploaded,
             "pdf_name": pdf_name,
-            "num_paragraphs": len(paragraphs),
-            "num_chunks": len(chunked_segments)
+            "num_paragraphs": num_paragraphs,
+            "num_chunks": num_chunks
         }
 
+
+def _extract_part(part_path: str) -> List[str]:
+    """
+    Extract paragraphs from one PDF part in a part-extraction worker process.
+    
+    Args:
+        part_path: Path to the PDF part
+        
+    Returns:
+        List of extracted paragraph strings
+    """
+    global _part_extractor
+    if _part_extractor is None:
+        _part_extractor = Extractor()
+    return _part_extractor.extract(part_path)
+
+
+def _init_worker(
+    pinecone_api_key: Optional[str],
+    pinecone_index_name: Optional[str],
+    pinecone_environment: Optional[str],
+    embedding_cache_path: Optional[str]
+) -> None:
+    """
+    Create the KnowledgeExtractor used by an extract_many worker process.
+    
+    The Pinecone client and embedding model are not fork-safe, so every worker
+    builds its own from the index settings instead of inheriting the parent's.
+    
+    Args:
+        pinecone_api_key: Pinecone API key
+        pinecone_index_name: Pinecone index name
+        pinecone_environment: Pinecone environment/region
+        embedding_cache_path: SQLite file caching chunk embeddings across runs
+    """
+    global _worker_extractor
+    _worker_extractor = KnowledgeExtractor(
+        pinecone_api_key=pinecone_api_key,
+        pinecone_index_name=pinecone_index_name,
+        pinecone_environment=pinecone_environment,
+        embedding_cache_path=embedding_cache_path
+    )
+
+
+def _extract_one(args: tuple) -> dict:
+    """
+    Run the extraction pipeline for one PDF in an extract_many worker process.
+    
+    Args:
+        args: Tuple of (pdf_path, chunk_size, overlap, batch_size)
+        
+    Returns:
+        Extraction results for the PDF (see KnowledgeExtractor.extract), with an
+        "error" entry instead if the PDF failed
+    """
+    pdf_path, chunk_size, overlap, batch_size = args
+    try:
+        # Pool workers are daemonic and can't start part-extraction processes
+        return _worker_extractor.extract(
+            pdf_path, chunk_size=chunk_size, overlap=overlap, batch_size=batch_size, extract_workers=0
+        )
+    except Exception as e:
+        print(f"Error processing {pdf_path}: {e}")
+        return {
+            "total_uploaded": 0,
+            "pdf_name": Path(pdf_path).stem,
+            "num_paragraphs": 0,
+            "num_chunks": 0,
+            "error": str(e)
+        }
+
+
+def extract_many(
+    pdf_paths: List[str],
+    processes: Optional[int] = None,
+    pinecone_api_key: Optional[str] = None,
+    pinecone_index_name: Optional[str] = None,
+    pinecone_environment: Optional[str] = None,
+    chunk_size: int = 300,
+    overlap: int = 50,
+    batch_size: int = 100,
+    embedding_cache_path: Optional[str] = None
+) -> Dict[str, object]:
+    """
+    Extract and upload several PDFs in parallel, one PDF per worker process at a time.
+    
+    Workers are started with the "spawn" method and each loads its own embedding
+    model and Pinecone client, so keep processes within the machine's memory budget.
+    
+    Args:
+        pdf_paths: Paths to the PDF files (can be relative or absolute)
+        processes: Number of worker processes (defaults to min(len(pdf_paths), CPU count))
+        pinecone_api_key: Pinecone API key (defaults to PINECONE_API_KEY env var)
+        pinecone_index_name: Pinecone index name (defaults to PINECONE_INDEX_NAME env var or "pdf-knowledge-base")
+        pinecone_environment: Pinecone environment/region (defaults to PINECONE_ENVIRONMENT env var or "us-east-1")
+        chunk_size: Number of words per chunk (default: 300)
+        overlap: Number of overlapping words between consecutive chunks (default: 50)
+        batch_size: Number of chunks to process and upload in each batch (default: 100)
+        embedding_cache_path: SQLite file caching chunk embeddings across runs, shared by
+                              all workers (defaults to EMBEDDING_CACHE_PATH env var; no cache if unset)
+        
+    Returns:
+        Dictionary with:
+            - total_uploaded: Number of vectors uploaded across all PDFs
+            - results: Per-PDF extraction results, in the order of pdf_paths
+    """
+    if not pdf_paths:
+        return {"total_uploaded": 0, "results": []}
+    
+    processes = processes or min(len(pdf_paths), os.cpu_count() or 1)
+    tasks = [(str(pdf_path), chunk_size, overlap, batch_size) for pdf_path in pdf_paths]
+    
+    with mp.get_context("spawn").Pool(
+        processes,
+        initializer=_init_worker,
+        initargs=(pinecone_api_key, pinecone_index_name, pinecone_environment, embedding_cache_path)
+    ) as pool:
+        results = pool.map(_extract_one, tasks, chunksize=1)
+    
+    return {
+        "total_uploaded": sum(result["total_uploaded"] for result in results),
+        "results": results
+    }
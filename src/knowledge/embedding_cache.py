@@ -0,0 +1,96 @@
+"""
+Embedding Cache Module
+
+This module provides the EmbeddingCache class for persisting chunk embeddings on disk
+so unchanged chunks are not re-embedded when a PDF is ingested again.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    A SQLite-backed cache of text embeddings.
+
+    Embeddings are keyed by sha256(model_id + text), so a different embedding model
+    never reuses another model's vectors, and are stored as float32 so a cached
+    vector is identical to a freshly computed one. The database uses WAL mode, so
+    parallel ingestion processes can share one cache file.
+    """
+
+    def __init__(self, cache_path: str, model_id: str):
+        """
+        Initialize the EmbeddingCache, creating the database file if needed.
+
+        Args:
+            cache_path: Path to the SQLite database file
+            model_id: Identifier of the embedding model the cached vectors come from
+        """
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        self._key_prefix = model_id.encode("utf-8") + b"\0"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Vectors live in emb_f32; the float16 vectors of the former emb table are not reused
+        self._conn.execute("CREATE TABLE IF NOT EXISTS emb_f32 (h BLOB PRIMARY KEY, v BLOB NOT NULL)")
+        self._conn.commit()
+
+    def _key(self, text: str) -> bytes:
+        """
+        Compute the cache key of a text.
+
+        Args:
+            text: The embedded text
+
+        Returns:
+            32-byte sha256 digest
+        """
+        return hashlib.sha256(self._key_prefix + text.encode("utf-8")).digest()
+
+    def embed(self, texts: List[str], embed_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Embed texts, computing only the ones missing from the cache.
+
+        Args:
+            texts: List of texts to embed
+            embed_fn: Function mapping a list of texts to their embeddings (one row per text)
+
+        Returns:
+            2-D float32 numpy array with one row per text
+        """
+        keys = [self._key(text) for text in texts]
+
+        # Look up every key of the batch in one query
+        with self._lock:
+            placeholders = ",".join("?" * len(keys))
+            rows = self._conn.execute(
+                f"SELECT h, v FROM emb_f32 WHERE h IN ({placeholders})", keys
+            ).fetchall()
+        found: Dict[bytes, np.ndarray] = {h: np.frombuffer(v, dtype=np.float32) for h, v in rows}
+
+        # Embed and store the texts that are not cached yet
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        if missing:
+            new_embeddings = np.asarray(embed_fn([texts[i] for i in missing]), dtype=np.float32)
+            if new_embeddings.ndim == 1:
+                new_embeddings = new_embeddings.reshape(1, -1)
+            new_rows = [
+                (keys[i], embedding.tobytes())
+                for i, embedding in zip(missing, new_embeddings)
+            ]
+            with self._lock:
+                self._conn.executemany("INSERT OR IGNORE INTO emb_f32 (h, v) VALUES (?, ?)", new_rows)
+                self._conn.commit()
+            found.update((keys[i], embedding) for i, embedding in zip(missing, new_embeddings))
+
+        return np.stack([found[key] for key in keys])
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -2,10 +2,56 @@
 Module for fetching PDF files from S3 bucket.
 """
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+# Number of PDFs downloaded concurrently
+MAX_DOWNLOAD_WORKERS = 16
+
+# Large PDFs are fetched as parallel ranged GETs within each download
+DOWNLOAD_PART_CONCURRENCY = 4
+TRANSFER_CONFIG = TransferConfig(max_concurrency=DOWNLOAD_PART_CONCURRENCY, use_threads=True)
+
+
+def _etag_path(local_path: Path) -> Path:
+    """
+    Path of the sidecar file recording the S3 ETag a local PDF was downloaded from.
+    
+    Args:
+        local_path: Local path of the PDF
+    
+    Returns:
+        Path of the sidecar .etag file
+    """
+    return local_path.with_name(local_path.name + ".etag")
+
+
+def _is_unchanged(local_path: Path, etag: str, size: int) -> bool:
+    """
+    Check whether a local PDF is a complete copy of the S3 object with the given ETag.
+    
+    The ETag identifies the object's content (an MD5 for single-part uploads, a
+    part-hash for multipart ones), so comparing it with the sidecar recorded at
+    download time works for both; the size check guards against partial files.
+    
+    Args:
+        local_path: Local path of the PDF
+        etag: ETag of the S3 object (without quotes)
+        size: Size of the S3 object in bytes
+    
+    Returns:
+        True if the local file can be used without downloading it again
+    """
+    etag_path = _etag_path(local_path)
+    try:
+        return local_path.stat().st_size == size and etag_path.read_text() == etag
+    except OSError:
+        return False
+
 
 def fetch_pdfs_from_s3(bucket_name: str = "knowledge-assistant-project", 
                        s3_prefix: str = "raw-pdf-data/",
@@ -38,7 +84,9 @@ def fetch_pdfs_from_s3(bucket_name: str = "knowledge-assistant-project",
         's3',
         aws_access_key_id=aws_access_key_id,
         aws_secret_access_key=aws_secret_access_key,
-        region_name=aws_region
+        region_name=aws_region,
+        # Enough pooled connections for every concurrent download and its ranged GETs
+        config=Config(max_pool_connections=MAX_DOWNLOAD_WORKERS * DOWNLOAD_PART_CONCURRENCY)
     )
     
     data_path = Path(data_dir)
@@ -61,7 +109,7 @@ def fetch_pdfs_from_s3(bucket_name: str = "knowledge-assistant-project",
                     key = obj['Key']
                     # Check if the file is a PDF
                     if key.lower().endswith('.pdf'):
-                        pdf_files.append(key)
+                        pdf_files.append((key, obj['ETag'].strip('"'), obj['Size']))
         
         if not pdf_files:
             print("No PDF files found in the specified S3 path")
@@ -70,20 +118,36 @@ def fetch_pdfs_from_s3(bucket_name: str = "knowledge-assistant-project",
         print(f"\nFound {len(pdf_files)} PDF file(s) in S3:")
         print("-" * 50)
         
-        # Download each PDF file
+        # Download the PDF files concurrently (the S3 client is thread-safe)
         downloaded_files = []
-        for pdf_key in pdf_files:
-            # Extract filename from S3 key
-            filename = os.path.basename(pdf_key)
-            local_path = data_path / filename
+        with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+            futures = {}
+            for pdf_key, etag, size in pdf_files:
+                # Extract filename from S3 key
+                filename = os.path.basename(pdf_key)
+                local_path = data_path / filename
+                
+                # Skip files already downloaded from the same S3 object version
+                if _is_unchanged(local_path, etag, size):
+                    print(f"Unchanged, skipping download: {filename}")
+                    downloaded_files.append(filename)
+                    continue
+                
+                print(f"Downloading: {filename}")
+                futures[executor.submit(
+                    s3_client.download_file, bucket_name, pdf_key, str(local_path),
+                    Config=TRANSFER_CONFIG
+                )] = (filename, local_path, etag)
             
-            print(f"Downloading: {filename}")
-            try:
-                s3_client.download_file(bucket_name, pdf_key, str(local_path))
-                downloaded_files.append(filename)
-                print(f"  ✓ Successfully downloaded: {filename}")
-            except ClientError as e:
-                print(f"  ✗ Error downloading {filename}: {str(e)}")
+            for future in as_completed(futures):
+                filename, local_path, etag = futures[future]
+                try:
+                    future.result()
+                    _etag_path(local_path).write_text(etag)
+                    downloaded_files.append(filename)
+                    print(f"  ✓ Successfully downloaded: {filename}")
+                except ClientError as e:
+                    print(f"  ✗ Error downloading {filename}: {str(e)}")
         
         print("-" * 50)
         print(f"\nDownloaded {len(downloaded_files)} PDF file(s):")
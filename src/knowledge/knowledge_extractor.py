@@ -4,14 +4,65 @@ PDF Extractor Module
 This module provides the Extractor class for extracting text content from PDF files.
 """
 
+import importlib.util
+import math
+import os
 import re
+import tempfile
+import multiprocessing as mp
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import List, Optional
+from types import SimpleNamespace
+from typing import Iterator, List, Optional, Tuple
+from lxml import etree, html as lxml_html
+from pypdf import PdfReader, PdfWriter
 from unstructured.partition.pdf import partition_pdf
 
 from src.agent.query_processing import QueryProcessor
 from src.knowledge.post_processor import PostProcessor
 
+# Number of leading pages probed for an embedded text layer
+TEXT_LAYER_SAMPLE_PAGES = 3
+
+# With partition_workers > 1, hi_res PDFs are partitioned in page ranges of at least
+# this many pages each (fewer pages aren't worth a worker's model loading time)
+MIN_PAGES_PER_PARTITION = 4
+
+# PyMuPDF backend: a text block is a heading if its largest font is at least
+# HEADING_FONT_SCALE times the body font size and it has at most HEADING_MAX_WORDS words
+HEADING_FONT_SCALE = 1.2
+HEADING_MAX_WORDS = 20
+
+# Bullet or "1." / "1)" at the start of a text block marks a list item
+_LIST_ITEM_RE = re.compile(r'^(?:[\u00b7\u2022\u25aa\u25cf\u2013*-]|\d{1,3}[.)])\s')
+
+# Minimum number of words for an element to be kept, by category (default: 1,
+# which any non-empty text meets)
+_CATEGORY_MIN_WORDS = {
+    'Title': 0,
+    'Heading': 0,
+    'Table': 0,
+    'ListItem': 1,
+    'FigureCaption': 1,
+    'NarrativeText': 3,
+}
+
+
+class _PdfElement:
+    """
+    A minimal stand-in for an unstructured element, built by the PyMuPDF backend.
+    
+    Exposes the attributes the grouping and filtering code reads:
+    category, text and metadata.page_number.
+    """
+    
+    def __init__(self, category: str, text: str, page_number: int):
+        self.category = category
+        self.text = text
+        self.metadata = SimpleNamespace(page_number=page_number)
+
 
 class Extractor:
     """
@@ -23,16 +74,25 @@ class Extractor:
     - Processing paragraphs using QueryProcessor
     """
     
-    def __init__(self, enable_post_processing: bool = True, verbose: bool = False):
+    def __init__(
+        self,
+        enable_post_processing: bool = True,
+        verbose: bool = False,
+        post_processing_cache_dir: Optional[str] = None
+    ):
         """
         Initialize the Extractor.
         
         Args:
             enable_post_processing: Whether to apply post-processing (default: True)
             verbose: Whether to print debugging information (default: False)
+            post_processing_cache_dir: Directory for caching post-processed texts
+                                       (falls back to POST_PROCESSING_CACHE_DIR env var; unset disables the cache)
         """
         self.query_processor = QueryProcessor()
-        self.post_processor = PostProcessor()
+        self.post_processor = PostProcessor(
+            cache_dir=post_processing_cache_dir or os.getenv("POST_PROCESSING_CACHE_DIR")
+        )
         self.enable_post_processing = enable_post_processing
         self.verbose = verbose
         
@@ -47,7 +107,7 @@ class Extractor:
         }
     
     
-    def _group_elements_by_structure(self, elements) -> List[tuple]:
+    def _group_elements_by_structure(self, elements) -> Iterator[Tuple[str, str, dict]]:
         """
         Group elements by document structure (sections, pages, headings).
         Combines consecutive narrative text, list items, and figure captions into coherent sections.
@@ -56,10 +116,9 @@ class Extractor:
         Args:
             elements: List of elements from unstructured
             
-        Returns:
-            List of tuples (text, category, metadata_dict)
+        Yields:
+            Tuples (text, category, metadata_dict), one section at a time
         """
-        grouped_items = []
         current_section = []
         current_section_category = None
         current_page = None
@@ -79,10 +138,10 @@ class Extractor:
                 # Combine all elements in current section
                 combined_text = ' '.join(current_section)
                 if combined_text.strip():
-                    grouped_items.append((combined_text, current_section_category or 'NarrativeText', {
+                    yield (combined_text, current_section_category or 'NarrativeText', {
                         'page': current_page,
                         'is_section': True
-                    }))
+                    })
                 current_section = []
                 current_section_category = None
             
@@ -92,23 +151,23 @@ class Extractor:
                 if current_section:
                     combined_text = ' '.join(current_section)
                     if combined_text.strip():
-                        grouped_items.append((combined_text, current_section_category or 'NarrativeText', {
+                        yield (combined_text, current_section_category or 'NarrativeText', {
                             'page': current_page,
                             'is_section': True
-                        }))
+                        })
                     current_section = []
                     current_section_category = None
                 
                 # Add table separately
                 table_text = self._convert_table_to_text(element)
                 if table_text:
-                    grouped_items.append((table_text, 'Table', {'page': page_number}))
+                    yield (table_text, 'Table', {'page': page_number})
             elif hasattr(element, 'text') and element.text:
                 text = element.text.strip()
                 if text:
                     if is_section_boundary:
                         # Headings/titles start a new section - add them separately
-                        grouped_items.append((text, category, {'page': page_number, 'is_heading': True}))
+                        yield (text, category, {'page': page_number, 'is_heading': True})
                         current_section = []
                         current_section_category = None
                     else:
@@ -124,12 +183,10 @@ class Extractor:
         if current_section:
             combined_text = ' '.join(current_section)
             if combined_text.strip():
-                grouped_items.append((combined_text, current_section_category or 'NarrativeText', {
+                yield (combined_text, current_section_category or 'NarrativeText', {
                     'page': current_page,
                     'is_section': True
-                }))
-        
-        return grouped_items
+                })
     
     def _convert_table_to_text(self, table_element) -> str:
         """
@@ -149,10 +206,22 @@ class Extractor:
         # Try to get HTML representation and convert to text
         if hasattr(table_element, 'metadata') and table_element.metadata:
             if hasattr(table_element.metadata, 'text_as_html') and table_element.metadata.text_as_html:
-                # Convert HTML table to readable text
-                # This is a simple conversion - could be enhanced with proper HTML parsing
+                # Convert HTML table to readable text: one "cell | cell | cell" line per row,
+                # from a single C-level parse of the HTML
                 html_text = table_element.metadata.text_as_html
-                # Remove HTML tags and clean up
+                try:
+                    root = lxml_html.fragment_fromstring(html_text, create_parent=True)
+                    rows = []
+                    for row in root.iter('tr'):
+                        cells = [' '.join(cell.text_content().split()) for cell in row.iter('td', 'th')]
+                        if any(cells):
+                            rows.append(' | '.join(cells))
+                    if rows:
+                        return '\n'.join(rows)
+                except (etree.ParserError, ValueError):
+                    pass
+                
+                # Fallback for HTML without parseable rows: remove HTML tags and clean up
                 text = re.sub(r'<[^>]+>', ' | ', html_text)
                 text = re.sub(r'\s*\|\s*', ' | ', text)  # Normalize separators
                 text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
@@ -161,7 +230,151 @@ class Extractor:
         # Fallback: return empty string if no text representation available
         return ""
     
-    def extract(self, pdf_path: str, preserve_structure: bool = True) -> List[str]:
+    def _has_text_layer(self, pdf_path: Path) -> bool:
+        """
+        Check whether a PDF has an embedded text layer by sampling its first pages.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            True if any sampled page yields text, False otherwise (or if the PDF can't be read)
+        """
+        try:
+            reader = PdfReader(str(pdf_path))
+            for page in reader.pages[:TEXT_LAYER_SAMPLE_PAGES]:
+                text = page.extract_text()
+                if text and text.strip():
+                    return True
+        except Exception as e:
+            print(f"Warning: Could not probe text layer of {pdf_path.name}: {e}")
+        return False
+    
+    def _partition_pymupdf(self, pdf_path: Path) -> List[_PdfElement]:
+        """
+        Partition a text-native PDF into elements with PyMuPDF, without any layout models.
+        
+        Each text block becomes an element: headings are detected by font size relative to
+        the body text, list items by a leading bullet or number, everything else is
+        NarrativeText. Tables found by PyMuPDF become Table elements (rows as "a | b | c"
+        lines) in place of the text blocks they cover.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            List of elements in reading order
+        """
+        import pymupdf
+        
+        pages = []
+        font_sizes = Counter()  # Characters per font size, to find the body text size
+        with pymupdf.open(str(pdf_path)) as doc:
+            for page in doc:
+                # Tables first, so the text blocks inside them can be skipped
+                tables = []
+                if hasattr(page, "find_tables"):
+                    for table in page.find_tables().tables:
+                        rows = [
+                            " | ".join((cell or "").replace("\n", " ").strip() for cell in row)
+                            for row in table.extract()
+                        ]
+                        table_text = "\n".join(row for row in rows if row.strip(" |"))
+                        tables.append((pymupdf.Rect(table.bbox), table_text))
+                
+                blocks = []  # (text, largest font size) or (table text, None)
+                emitted_tables = set()
+                for block in page.get_text("dict")["blocks"]:
+                    if block.get("type") != 0:
+                        continue
+                    
+                    # A block inside a table is replaced by the table (once)
+                    x0, y0, x1, y1 = block["bbox"]
+                    center = pymupdf.Point((x0 + x1) / 2, (y0 + y1) / 2)
+                    table_index = next((i for i, (rect, _) in enumerate(tables) if center in rect), None)
+                    if table_index is not None:
+                        if table_index not in emitted_tables:
+                            emitted_tables.add(table_index)
+                            blocks.append((tables[table_index][1], None))
+                        continue
+                    
+                    lines = []
+                    max_size = 0.0
+                    for line in block["lines"]:
+                        line_text = "".join(span["text"] for span in line["spans"])
+                        for span in line["spans"]:
+                            font_sizes[round(span["size"], 1)] += len(span["text"])
+                            max_size = max(max_size, span["size"])
+                        lines.append(line_text)
+                    text = "\n".join(lines).strip()
+                    if text:
+                        blocks.append((text, max_size))
+                
+                # Tables without any text block inside them go after the page's text
+                blocks.extend(
+                    (table_text, None) for i, (_, table_text) in enumerate(tables)
+                    if i not in emitted_tables
+                )
+                pages.append((page.number + 1, blocks))
+        
+        body_size = font_sizes.most_common(1)[0][0] if font_sizes else 0.0
+        
+        elements = []
+        for page_number, blocks in pages:
+            for text, size in blocks:
+                if size is None:
+                    if text:
+                        elements.append(_PdfElement('Table', text, page_number))
+                elif body_size and size >= body_size * HEADING_FONT_SCALE and len(text.split()) <= HEADING_MAX_WORDS:
+                    elements.append(_PdfElement('Title', text, page_number))
+                elif _LIST_ITEM_RE.match(text):
+                    elements.append(_PdfElement('ListItem', text, page_number))
+                else:
+                    elements.append(_PdfElement('NarrativeText', text, page_number))
+        
+        return elements
+    
+    def _partition_parallel(self, pdf_path: Path, strategy: str, workers: int) -> Optional[list]:
+        """
+        Partition a PDF in page ranges, one per worker process, and concatenate the elements.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            strategy: unstructured partitioning strategy of each page range
+            workers: Maximum number of worker processes
+            
+        Returns:
+            List of elements in page order, with page numbers of the whole PDF, or None if
+            the PDF is too short for more than one page range (partition it in-process then)
+        """
+        reader = PdfReader(str(pdf_path))
+        num_pages = len(reader.pages)
+        num_parts = min(workers, num_pages // MIN_PAGES_PER_PARTITION)
+        if num_parts <= 1:
+            # A single range would only add a PDF copy and a worker reloading the models
+            return None
+        pages_per_part = math.ceil(num_pages / num_parts)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            part_paths = split_pdf(reader, pages_per_part, Path(tmp_dir))
+            if self.verbose:
+                print(f"Partitioning {len(part_paths)} page ranges of {pages_per_part} pages in parallel")
+            
+            page_offsets = range(0, num_pages, pages_per_part)
+            with ProcessPoolExecutor(max_workers=len(part_paths), mp_context=mp.get_context("spawn")) as executor:
+                elements = []
+                for part_elements in executor.map(_partition_part, part_paths, repeat(strategy), page_offsets):
+                    elements.extend(part_elements)
+        
+        return elements
+    
+    def extract(
+        self,
+        pdf_path: str,
+        preserve_structure: bool = True,
+        strategy: str = "auto",
+        partition_workers: int = 1
+    ) -> List[str]:
         """
         Extract text content from a PDF file using unstructured.
         Extracts multiple element types: paragraphs, headings, lists, tables, and captions.
@@ -171,6 +384,12 @@ class Extractor:
             preserve_structure: Whether to group elements by document structure (default: True).
                                 When True, consecutive narrative text elements are combined into
                                 coherent sections, preserving document structure.
+            strategy: Partitioning strategy (default: "auto"). "auto" reads the text layer of
+                      text-native PDFs with PyMuPDF (or unstructured's "fast" strategy if PyMuPDF
+                      isn't installed) and uses the "hi_res" layout models otherwise;
+                      "pymupdf", "fast" or "hi_res" forces that strategy.
+            partition_workers: Number of worker processes for the "hi_res" strategy (default: 1).
+                               Above 1, the PDF is split into page ranges partitioned in parallel.
             
         Returns:
             List of text strings extracted from the PDF (paragraphs, headings, lists, tables, etc.)
@@ -190,38 +409,58 @@ class Extractor:
         if not pdf_path.exists():
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
         
-        # Partition PDF with table structure inference enabled
-        elements = partition_pdf(
-            filename=str(pdf_path),
-            strategy="hi_res",  # High resolution for better text extraction
-            infer_table_structure=True,  # Enable table structure inference
-            extract_images_in_pdf=False,  # We only want text
-        )
+        # Layout models are only needed when there is no text layer to read
+        if strategy == "auto":
+            if not self._has_text_layer(pdf_path):
+                strategy = "hi_res"
+            elif importlib.util.find_spec("pymupdf") is not None:
+                strategy = "pymupdf"
+            else:
+                strategy = "fast"
+        
+        if strategy == "pymupdf":
+            # PyMuPDF's C text extraction, with no model inference at all
+            elements = self._partition_pymupdf(pdf_path)
+        elif strategy == "fast":
+            # Read the embedded text layer directly, skipping the layout models
+            elements = partition_pdf(
+                filename=str(pdf_path),
+                strategy="fast",
+                infer_table_structure=False,
+                extract_images_in_pdf=False,  # We only want text
+            )
+        else:
+            elements = None
+            if partition_workers > 1 and not mp.current_process().daemon:
+                # The layout models run single-threaded, so page ranges are partitioned in
+                # parallel (daemonic processes, e.g. pool workers, can't start workers)
+                elements = self._partition_parallel(pdf_path, strategy, partition_workers)
+            
+            if elements is None:
+                # Partition PDF with table structure inference enabled
+                elements = partition_pdf(
+                    filename=str(pdf_path),
+                    strategy=strategy,  # High resolution for better text extraction
+                    infer_table_structure=True,  # Enable table structure inference
+                    extract_images_in_pdf=False,  # We only want text
+                )
         
         if self.verbose:
+            print(f"Partition strategy: {strategy}")
             print(f"Total elements found in PDF: {len(elements)}")
         
         # Group elements by structure if requested
         if preserve_structure:
-            grouped_items = self._group_elements_by_structure(elements)
+            # Consume the sections as they are grouped, without building a list of them
+            # (grouped texts are stripped and non-empty, so every category's minimum
+            # of at most 1 word is met)
+            extracted_items = [
+                (text, category)
+                for text, category, _ in self._group_elements_by_structure(elements)
+                if text
+            ]
             if self.verbose:
-                print(f"Grouped into {len(grouped_items)} structured sections")
-            
-            # Extract texts from grouped items
-            extracted_items = []
-            for text, category, metadata in grouped_items:
-                if text and text.strip():
-                    # Apply relaxed filtering based on category
-                    words = text.split()
-                    if category in ['Title', 'Heading']:
-                        # Always include headings/titles
-                        extracted_items.append((text, category))
-                    elif category == 'Table':
-                        # Always include tables
-                        extracted_items.append((text, category))
-                    elif len(words) >= 1:
-                        # Include any other grouped text with at least 1 word
-                        extracted_items.append((text, category))
+                print(f"Grouped into {len(extracted_items)} structured sections")
         else:
             # Original extraction logic (individual elements)
             extracted_items = []
@@ -240,45 +479,24 @@ class Extractor:
                     continue
                 
                 # Handle ALL other element types - be very inclusive
-                if hasattr(element, 'text') and element.text:
-                    text = element.text.strip()
-                    if text:  # Include ANY non-empty text, regardless of category or length
-                        # For known categories, use relaxed thresholds
-                        if category in self.extracted_categories:
-                            # For headings and titles, include all (they're important)
-                            if category in ['Title', 'Heading']:
-                                extracted_items.append((text, category))
-                            # For list items, include all (even single words)
-                            elif category == 'ListItem':
-                                extracted_items.append((text, category))
-                            # For figure captions, include all
-                            elif category == 'FigureCaption':
-                                extracted_items.append((text, category))
-                            # For narrative text, include if at least 3 words (relaxed from 10)
-                            elif category == 'NarrativeText':
-                                if len(text.split()) >= 3:  # Reduced from 10 to 3
-                                    extracted_items.append((text, category))
-                        else:
-                            # Include ANY unknown category if it has at least 1 word (very permissive)
-                            if len(text.split()) >= 1:
-                                extracted_items.append((text, category or 'Unknown'))
+                text = (element.text or '').strip() if hasattr(element, 'text') else ''
+                if not text:
+                    continue
+                
+                # Headings, titles, list items and captions are always kept, narrative text
+                # needs at least 3 words, and any unknown category at least 1 word
+                min_words = _CATEGORY_MIN_WORDS.get(category, 1)
+                if min_words > 1 and len(text.split(None, min_words - 1)) < min_words:
+                    continue
+                extracted_items.append((text, category or 'Unknown'))
             
             if self.verbose:
                 print(f"Category distribution: {category_counts}")
                 print(f"Extracted items before filtering: {len(extracted_items)}")
         
         # Final filtering: very relaxed - only remove completely empty texts
-        # Keep headings/titles always, keep others if they have at least 1 word
-        filtered_texts = []
-        for text, cat in extracted_items:
-            words = text.split()
-            # Keep headings/titles always (they provide important context)
-            if cat in ['Title', 'Heading']:
-                if text:
-                    filtered_texts.append(text)
-            # Keep other texts if they have at least 1 word (very permissive)
-            elif len(words) >= 1:
-                filtered_texts.append(text)
+        # (a text has at least 1 word exactly when it is not all whitespace)
+        filtered_texts = [text for text, _ in extracted_items if text and not text.isspace()]
         
         if self.verbose:
             print(f"Filtered texts before post-processing: {len(filtered_texts)}")
@@ -308,10 +526,55 @@ class Extractor:
         Returns:
             List of processed paragraph strings
         """
-        processed_paragraphs = []
-        for paragraph in paragraphs:
-            processed = self.query_processor.process(paragraph)
-            processed_paragraphs.append(processed)
+        return self.query_processor.process_batch(paragraphs)
+
+
+def split_pdf(reader: PdfReader, pages_per_part: int, output_dir: Path) -> List[str]:
+    """
+    Split a PDF into consecutive parts of at most pages_per_part pages.
+    
+    Args:
+        reader: PdfReader of the PDF to split
+        pages_per_part: Maximum number of pages per part
+        output_dir: Directory the part files are written to
         
-        return processed_paragraphs
+    Returns:
+        Paths of the part files, in page order
+    """
+    part_paths = []
+    for start in range(0, len(reader.pages), pages_per_part):
+        writer = PdfWriter()
+        for page in reader.pages[start:start + pages_per_part]:
+            writer.add_page(page)
+        
+        part_path = output_dir / f"part_{start // pages_per_part:05d}.pdf"
+        with open(part_path, "wb") as f:
+            writer.write(f)
+        part_paths.append(str(part_path))
+    
+    return part_paths
+
 
+def _partition_part(part_path: str, strategy: str, page_offset: int) -> list:
+    """
+    Partition one page range of a PDF in a worker process.
+    
+    Args:
+        part_path: Path to the PDF part
+        strategy: unstructured partitioning strategy
+        page_offset: Number of pages of the whole PDF before this part
+        
+    Returns:
+        List of elements, with page numbers shifted to those of the whole PDF
+    """
+    elements = partition_pdf(
+        filename=part_path,
+        strategy=strategy,
+        infer_table_structure=True,
+        extract_images_in_pdf=False,
+    )
+    for element in elements:
+        metadata = getattr(element, 'metadata', None)
+        if metadata is not None and getattr(metadata, 'page_number', None) is not None:
+            metadata.page_number += page_offset
+    return elements
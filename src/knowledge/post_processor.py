@@ -5,9 +5,94 @@ This module provides the PostProcessor class for cleaning and processing
 extracted text from PDFs to improve quality and accuracy.
 """
 
+import hashlib
+import json
+import os
 import re
 import string
-from typing import List, Tuple
+import tempfile
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# ASCII character classes used by the quality checks, as byte strings for bytes.translate
+_PRINTABLE_BYTES = string.printable.encode('ascii')
+_DIGIT_BYTES = string.digits.encode('ascii')
+_PUNCTUATION_BYTES = string.punctuation.encode('ascii')
+
+# str.translate table deleting every ASCII character (leaves only non-ASCII ones)
+_DELETE_ASCII = dict.fromkeys(range(128))
+
+# clean_text character classes, compiled once. Invisible characters, Unicode spaces
+# and smart quotes are all non-ASCII, so those steps are skipped for ASCII-only text.
+_INVISIBLE_CHARS_RE = re.compile(r'[\u200b-\u200f\u202a-\u202e\u2060-\u206f\ufeff]')
+_UNICODE_SPACES_RE = re.compile(r'[\u00a0\u1680\u2000-\u200a\u202f\u205f\u3000]')
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]')
+
+# clean_text multi-character patterns, compiled once
+_EXCESSIVE_NEWLINES_RE = re.compile(r'\n{3,}')
+# The (?<!\w) anchors only skip match attempts that start mid-word; a match starting
+# there would start at the word's first character anyway, so results are unchanged.
+_HYPHENATED_LINE_BREAK_RE = re.compile(r'(?<!\w)(\w+)-\s*\n\s*(\w+)')
+_LINE_BREAK_IN_SENTENCE_RE = re.compile(r'(?<!\w)(\w+)\s*\n\s*(\w+)')
+_MULTIPLE_SPACES_RE = re.compile(r' +')
+_REPEATED_SENTENCE_PUNCTUATION_RE = re.compile(r'([.!?]){2,}')
+_PUNCTUATION_RUN_RE = re.compile(r'[^\w\s]{4,}')
+
+# A word (maximal run of non-whitespace) without any ASCII letter; such a word has no
+# alphabetic character at all if it is ASCII, otherwise its characters must be checked
+_NON_ASCII_ALPHA_WORD_RE = re.compile(r'(?<!\S)[^\sA-Za-z]+(?!\S)')
+
+# Any character (other than a newline) repeated more than 20 times in a row
+_CHARACTER_REPETITION_RE = re.compile(r'(.)\1{20,}')
+
+# preserve_sentence_structure patterns, compiled once
+_MISSING_SPACE_AFTER_SENTENCE_RE = re.compile(r'([.!?])([A-Za-z])')
+_COMMA_SPACING_RE = re.compile(r'\s*,\s*')
+_COLON_SPACING_RE = re.compile(r'\s*:\s*')
+_SEMICOLON_SPACING_RE = re.compile(r'\s*;\s*')
+_SPACE_BEFORE_PUNCTUATION_RE = re.compile(r'\s+([,.!?;:])')
+_SPACE_AFTER_PUNCTUATION_RE = re.compile(r'([,.!?;:])\s*')
+
+
+# Counters of PostProcessor.validation_stats
+_VALIDATION_STAT_KEYS = (
+    'total_processed',
+    'removed_empty',
+    'removed_non_printable',
+    'removed_excessive_digits',
+    'removed_excessive_punctuation',
+    'removed_character_repetition',
+    'removed_few_words',
+    'removed_low_alphabetic_ratio',
+)
+
+# Version of the post-processing logic, part of every process() cache key. Bump it
+# whenever clean_text, validate_text_quality, preserve_sentence_structure or the
+# merging rules change, so results cached by an older version are not reused.
+_CACHE_VERSION = 1
+
+# PostProcessor.process spreads cleaning/validation over worker processes for at
+# least this many texts (below it, process startup costs more than it saves);
+# each worker task handles PARALLEL_BATCH_SIZE texts
+PARALLEL_MIN_TEXTS = 2000
+PARALLEL_BATCH_SIZE = 256
+
+
+def _count_bytes(data: bytes, members: bytes) -> int:
+    """
+    Count the bytes of data that occur in members, in one C-level pass.
+    
+    Args:
+        data: Bytes to scan
+        members: Set of byte values to count
+        
+    Returns:
+        Number of bytes of data contained in members
+    """
+    return len(data) - len(data.translate(None, members))
 
 
 class PostProcessor:
@@ -21,8 +106,16 @@ class PostProcessor:
     - Text quality validation
     """
     
-    def __init__(self):
-        """Initialize the PostProcessor."""
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize the PostProcessor.
+        
+        Args:
+            cache_dir: Optional directory for caching process() results on disk, keyed by
+                       a hash of the input texts (default: None, no caching)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        
         # Common OCR error patterns (character substitutions)
         # Note: These are applied carefully to avoid false positives
         self.ocr_fixes = [
@@ -37,16 +130,7 @@ class PostProcessor:
         self.sentence_endings = re.compile(r'[.!?]\s+')
         
         # Track validation statistics
-        self.validation_stats = {
-            'total_processed': 0,
-            'removed_empty': 0,
-            'removed_non_printable': 0,
-            'removed_excessive_digits': 0,
-            'removed_excessive_punctuation': 0,
-            'removed_character_repetition': 0,
-            'removed_few_words': 0,
-            'removed_low_alphabetic_ratio': 0,
-        }
+        self.validation_stats = dict.fromkeys(_VALIDATION_STAT_KEYS, 0)
     
     def clean_text(self, text: str) -> str:
         """
@@ -65,31 +149,36 @@ class PostProcessor:
         # Remove leading/trailing whitespace
         text = text.strip()
         
-        # Remove zero-width characters and other invisible characters
-        text = re.sub(r'[\u200b-\u200f\u202a-\u202e\u2060-\u206f\ufeff]', '', text)
-        
-        # Normalize different types of spaces to regular space
-        text = re.sub(r'[\u00a0\u1680\u2000-\u200a\u202f\u205f\u3000]', ' ', text)
-        
-        # Remove excessive line breaks (more than 2 consecutive)
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        
-        # Fix broken words (words split with hyphen and newline)
-        # Pattern: word-\nword -> wordword (common PDF line break issue)
-        text = re.sub(r'(\w+)-\s*\n\s*(\w+)', r'\1\2', text)
+        if not text.isascii():
+            # Remove zero-width characters and other invisible characters
+            text = _INVISIBLE_CHARS_RE.sub('', text)
+            
+            # Normalize different types of spaces to regular space
+            text = _UNICODE_SPACES_RE.sub(' ', text)
         
-        # Fix words split across lines without hyphen
-        # Pattern: word\nword (where first word doesn't end with punctuation)
-        text = re.sub(r'(\w+)\s*\n\s*(\w+)', r'\1 \2', text)
+        # The line break fixes below only apply to text containing line breaks
+        if '\n' in text:
+            # Remove excessive line breaks (more than 2 consecutive)
+            text = _EXCESSIVE_NEWLINES_RE.sub('\n\n', text)
+            
+            # Fix broken words (words split with hyphen and newline)
+            # Pattern: word-\nword -> wordword (common PDF line break issue)
+            if '-' in text:
+                text = _HYPHENATED_LINE_BREAK_RE.sub(r'\1\2', text)
+            
+            # Fix words split across lines without hyphen
+            # Pattern: word\nword (where first word doesn't end with punctuation)
+            text = _LINE_BREAK_IN_SENTENCE_RE.sub(r'\1 \2', text)
         
         # Collapse multiple spaces into single space
-        text = re.sub(r' +', ' ', text)
+        if '  ' in text:
+            text = _MULTIPLE_SPACES_RE.sub(' ', text)
         
         # Fix multiple consecutive punctuation (except ellipsis)
-        text = re.sub(r'([.!?]){2,}', r'\1', text)
+        text = _REPEATED_SENTENCE_PUNCTUATION_RE.sub(r'\1', text)
         
         # Remove excessive punctuation (more than 3 consecutive)
-        text = re.sub(r'[^\w\s]{4,}', '', text)
+        text = _PUNCTUATION_RUN_RE.sub('', text)
         
         # Fix common OCR errors (be careful with these - they might be too aggressive)
         # Only apply in specific contexts to avoid false positives
@@ -98,18 +187,43 @@ class PostProcessor:
             text = re.sub(pattern, replacement, text)
         
         # Remove control characters except newlines and tabs
-        text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]', '', text)
+        text = _CONTROL_CHARS_RE.sub('', text)
         
-        # Normalize quotes (convert smart quotes to regular quotes)
-        text = text.replace('\u201c', '"').replace('\u201d', '"')
-        text = text.replace('\u2018', "'").replace('\u2019', "'")
-        text = text.replace('\u2013', '-').replace('\u2014', '--')
+        if not text.isascii():
+            # Normalize quotes (convert smart quotes to regular quotes)
+            text = text.replace('\u201c', '"').replace('\u201d', '"')
+            text = text.replace('\u2018', "'").replace('\u2019', "'")
+            text = text.replace('\u2013', '-').replace('\u2014', '--')
         
         # Final trim
         text = text.strip()
         
         return text
     
+    @staticmethod
+    def _continues_in_next(text_stripped: str, next_stripped: str) -> bool:
+        """
+        Decide whether a (stripped) paragraph is broken and continues in the next one.
+        
+        Args:
+            text_stripped: The paragraph, stripped of surrounding whitespace
+            next_stripped: The next paragraph, stripped of surrounding whitespace
+            
+        Returns:
+            True if the paragraph should be merged with the next one
+        """
+        # Check if current text doesn't end with sentence punctuation
+        if not text_stripped or text_stripped.endswith(('.', '!', '?')):
+            return False
+        
+        # If next text starts with lowercase, likely continuation
+        if next_stripped and next_stripped[0].islower():
+            return True
+        
+        # If current text is short and ends with comma/semicolon (splitting off at most
+        # 15 words is enough to tell whether there are fewer than 15)
+        return text_stripped.endswith((',', ';')) and len(text_stripped.split(None, 14)) < 15
+    
     def detect_broken_paragraphs(self, texts: List[str]) -> List[Tuple[str, bool]]:
         """
         Detect potentially broken paragraphs that should be merged.
@@ -127,28 +241,14 @@ class PostProcessor:
         if not texts:
             return []
         
-        results = []
-        for i, text in enumerate(texts):
-            should_merge = False
-            
-            # Skip headings and titles (they're usually complete)
-            if i < len(texts) - 1:  # Not the last item
-                text_stripped = text.strip()
-                next_text = texts[i + 1].strip() if i + 1 < len(texts) else ""
-                
-                # Check if current text doesn't end with sentence punctuation
-                if text_stripped and not re.search(r'[.!?]\s*$', text_stripped):
-                    # If next text starts with lowercase, likely continuation
-                    if next_text and next_text[0].islower():
-                        should_merge = True
-                    # If current text is short and ends with comma/semicolon
-                    elif len(text_stripped.split()) < 15 and re.search(r'[,;]\s*$', text_stripped):
-                        should_merge = True
-                    # If current text is very short (less than 5 words) and next starts lowercase
-                    elif len(text_stripped.split()) < 5 and next_text and next_text[0].islower():
-                        should_merge = True
-            
-            results.append((text, should_merge))
+        stripped = [text.strip() for text in texts]
+        
+        # The last item has nothing to merge with
+        results = [
+            (texts[i], self._continues_in_next(stripped[i], stripped[i + 1]))
+            for i in range(len(texts) - 1)
+        ]
+        results.append((texts[-1], False))
         
         return results
     
@@ -156,6 +256,9 @@ class PostProcessor:
         """
         Merge broken paragraphs that were incorrectly split.
         
+        Uses the same rules as detect_broken_paragraphs, applied in a single pass
+        over consecutive pairs.
+        
         Args:
             texts: List of text strings that may contain broken paragraphs
             
@@ -165,24 +268,18 @@ class PostProcessor:
         if not texts:
             return []
         
-        # Detect which paragraphs should be merged
-        merge_flags = self.detect_broken_paragraphs(texts)
+        stripped = [text.strip() for text in texts]
         
         merged = []
-        i = 0
-        while i < len(texts):
-            current_text = texts[i]
-            
-            # Check if this paragraph should be merged with the next one(s)
-            j = i
-            while j < len(merge_flags) and merge_flags[j][1]:
-                j += 1
-                if j < len(texts):
-                    # Merge with next paragraph
-                    current_text = current_text + " " + texts[j]
-            
-            merged.append(current_text)
-            i = j + 1
+        # Paragraphs of the current run, joined once the run ends
+        pieces = [texts[0]]
+        for i in range(len(texts) - 1):
+            if self._continues_in_next(stripped[i], stripped[i + 1]):
+                pieces.append(texts[i + 1])
+            else:
+                merged.append(" ".join(pieces))
+                pieces = [texts[i + 1]]
+        merged.append(" ".join(pieces))
         
         return merged
     
@@ -197,43 +294,56 @@ class PostProcessor:
         Returns:
             Tuple of (is_valid, reason_if_invalid)
         """
-        if not text or len(text.strip()) == 0:
+        # (isspace() answers the same question as strip() without copying the text)
+        if not text or text.isspace():
             self.validation_stats['removed_empty'] += 1
             return False, "Empty text"
         
+        # Character-class counts come from the ASCII bytes of the text: printable
+        # characters and punctuation are ASCII-only; non-ASCII digits are counted separately
+        ascii_bytes = text.encode('ascii', 'ignore')
+        text_length = len(text)
+        
         # Check for excessive non-printable characters (relaxed threshold)
-        non_printable_ratio = sum(1 for c in text if c not in string.printable) / len(text) if text else 0
+        non_printable_ratio = (text_length - _count_bytes(ascii_bytes, _PRINTABLE_BYTES)) / text_length
         if non_printable_ratio > 0.2:  # Relaxed from 10% to 20%
             self.validation_stats['removed_non_printable'] += 1
             return False, "Too many non-printable characters"
         
         # Check for excessive numbers (relaxed - allow more digits for technical content)
-        digit_ratio = sum(1 for c in text if c.isdigit()) / len(text) if text else 0
+        digit_count = _count_bytes(ascii_bytes, _DIGIT_BYTES)
+        if len(ascii_bytes) < text_length:
+            digit_count += sum(1 for c in text.translate(_DELETE_ASCII) if c.isdigit())
+        digit_ratio = digit_count / text_length
         if digit_ratio > 0.7:  # Relaxed from 50% to 70% (allow technical content with numbers)
             self.validation_stats['removed_excessive_digits'] += 1
             return False, "Too many digits (likely corrupted)"
         
         # Check for excessive special characters (relaxed)
-        special_char_ratio = sum(1 for c in text if c in string.punctuation) / len(text) if text else 0
+        special_char_ratio = _count_bytes(ascii_bytes, _PUNCTUATION_BYTES) / text_length
         if special_char_ratio > 0.5:  # Relaxed from 30% to 50%
             self.validation_stats['removed_excessive_punctuation'] += 1
             return False, "Too many special characters"
         
         # Check for repeated characters (more lenient)
-        if re.search(r'(.)\1{20,}', text):  # Relaxed from 10+ to 20+ repetitions
+        if _CHARACTER_REPETITION_RE.search(text):  # Relaxed from 10+ to 20+ repetitions
             self.validation_stats['removed_character_repetition'] += 1
             return False, "Excessive character repetition"
         
         # Check for valid word ratio (very relaxed - allow technical content)
-        words = text.split()
-        if words:
-            alphabetic_words = sum(1 for w in words if any(c.isalpha() for c in w))
-            if alphabetic_words / len(words) < 0.1:  # Relaxed from 30% to 10%
+        # (only the usually few words without an ASCII letter are inspected one by one)
+        num_words = len(text.split())
+        if num_words:
+            non_alphabetic_words = sum(
+                1 for w in _NON_ASCII_ALPHA_WORD_RE.findall(text)
+                if w.isascii() or not any(c.isalpha() for c in w)
+            )
+            if (num_words - non_alphabetic_words) / num_words < 0.1:  # Relaxed from 30% to 10%
                 self.validation_stats['removed_low_alphabetic_ratio'] += 1
                 return False, "Too few valid words"
         
         # Check minimum word count (very relaxed - allow single words)
-        if len(words) < 1:  # Relaxed from 3 to 1
+        if num_words < 1:  # Relaxed from 3 to 1
             self.validation_stats['removed_few_words'] += 1
             return False, "Too few words"
         
@@ -253,21 +363,21 @@ class PostProcessor:
             return ""
         
         # Ensure space after sentence-ending punctuation
-        text = re.sub(r'([.!?])([A-Za-z])', r'\1 \2', text)
+        text = _MISSING_SPACE_AFTER_SENTENCE_RE.sub(r'\1 \2', text)
         
         # Fix spacing around commas
-        text = re.sub(r'\s*,\s*', ', ', text)
+        text = _COMMA_SPACING_RE.sub(', ', text)
         
         # Fix spacing around colons and semicolons
-        text = re.sub(r'\s*:\s*', ': ', text)
-        text = re.sub(r'\s*;\s*', '; ', text)
+        text = _COLON_SPACING_RE.sub(': ', text)
+        text = _SEMICOLON_SPACING_RE.sub('; ', text)
         
         # Remove space before punctuation
-        text = re.sub(r'\s+([,.!?;:])', r'\1', text)
+        text = _SPACE_BEFORE_PUNCTUATION_RE.sub(r'\1', text)
         
-        # Ensure single space after punctuation
-        text = re.sub(r'([,.!?;:])\s*', r'\1 ', text)
-        text = re.sub(r'([,.!?;:])\s+', r'\1 ', text)
+        # Ensure single space after punctuation (consumes all whitespace that follows,
+        # so no run of whitespace after punctuation is left to collapse)
+        text = _SPACE_AFTER_PUNCTUATION_RE.sub(r'\1 ', text)
         
         return text.strip()
     
@@ -291,24 +401,123 @@ class PostProcessor:
         if not texts:
             return []
         
+        # The pipeline is deterministic in its input, so a cached result can be reused as is
+        cache_path = self._cache_path(texts) if self.cache_dir else None
+        if cache_path is not None and cache_path.exists():
+            try:
+                processed = json.loads(cache_path.read_text(encoding='utf-8'))
+                # Validation isn't rerun on a cache hit: only the total is known, so the
+                # previous call's counts are not left behind
+                self.validation_stats = dict.fromkeys(_VALIDATION_STAT_KEYS, 0)
+                self.validation_stats['total_processed'] = len(texts)
+                if verbose:
+                    print(f"\nPost-processing cache hit: {len(processed)} texts from {cache_path.name}")
+                return processed
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not read post-processing cache {cache_path}: {e}")
+        
         # Reset validation stats
-        self.validation_stats = {
-            'total_processed': 0,
-            'removed_empty': 0,
-            'removed_non_printable': 0,
-            'removed_excessive_digits': 0,
-            'removed_excessive_punctuation': 0,
-            'removed_character_repetition': 0,
-            'removed_few_words': 0,
-            'removed_low_alphabetic_ratio': 0,
-        }
+        self.validation_stats = dict.fromkeys(_VALIDATION_STAT_KEYS, 0)
+        
+        # Steps 1-3 are independent per text, so large inputs are split across
+        # worker processes (not from daemonic processes, which can't have children)
+        workers = min(os.cpu_count() or 1, len(texts) // PARALLEL_BATCH_SIZE)
+        if len(texts) >= PARALLEL_MIN_TEXTS and workers > 1 and not mp.current_process().daemon:
+            batches = [texts[i:i + PARALLEL_BATCH_SIZE] for i in range(0, len(texts), PARALLEL_BATCH_SIZE)]
+            processed = []
+            removed_reasons = {}
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as executor:
+                for batch_processed, batch_stats, batch_reasons in executor.map(
+                    _clean_and_validate_batch, batches, repeat(self.ocr_fixes), repeat(verbose)
+                ):
+                    processed.extend(batch_processed)
+                    for key, count in batch_stats.items():
+                        self.validation_stats[key] += count
+                    for reason, count in batch_reasons.items():
+                        removed_reasons[reason] = removed_reasons.get(reason, 0) + count
+        else:
+            processed, removed_reasons = self._clean_and_validate(texts, verbose)
         
+        # Step 4: Merge broken paragraphs
+        before_merge = len(processed)
+        processed = self.merge_broken_paragraphs(processed)
+        
+        if verbose:
+            print(f"\nPost-processing statistics:")
+            print(f"  Total texts processed: {self.validation_stats['total_processed']}")
+            print(f"  Texts removed: {sum(removed_reasons.values())}")
+            for reason, count in removed_reasons.items():
+                print(f"    - {reason}: {count}")
+            print(f"  Texts after validation: {before_merge}")
+            print(f"  Texts after merging: {len(processed)}")
+            print(f"  Final output: {len(processed)} texts")
+        
+        if cache_path is not None:
+            self._write_cache(cache_path, processed)
+        
+        return processed
+    
+    def _cache_path(self, texts: List[str]) -> Path:
+        """
+        Get the cache file of an input list, named after a SHA-256 hash of its contents.
+        
+        Each text is hashed with a length prefix, so different splits of the same
+        characters never collide; _CACHE_VERSION and the OCR fixes are hashed too, since
+        they change the output.
+        
+        Args:
+            texts: List of raw extracted text strings
+            
+        Returns:
+            Path of the JSON cache file for these texts
+        """
+        digest = hashlib.sha256(f"v{_CACHE_VERSION}\0{self.ocr_fixes!r}".encode('utf-8'))
+        for text in texts:
+            data = text.encode('utf-8', 'surrogatepass')
+            digest.update(len(data).to_bytes(8, 'little'))
+            digest.update(data)
+        return self.cache_dir / f"{digest.hexdigest()}.json"
+    
+    def _write_cache(self, cache_path: Path, processed: List[str]) -> None:
+        """
+        Atomically write processed texts to a cache file (write a temp file, then rename).
+        
+        Args:
+            cache_path: Path of the cache file
+            processed: List of processed text strings
+        """
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(processed, f)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"Warning: Could not write post-processing cache {cache_path}: {e}")
+    
+    def _clean_and_validate(self, texts: List[str], verbose: bool = False) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Clean, validate, and fix the sentence structure of each text (steps 1-3 of process).
+        Updates self.validation_stats.
+        
+        Args:
+            texts: List of raw extracted text strings
+            verbose: Whether to print debugging information
+            
+        Returns:
+            Tuple of (texts that passed validation, counts of removed texts per reason)
+        """
         processed = []
         removed_reasons = {}
         
+        # Every text is processed, so the total is counted once for the whole list
+        self.validation_stats['total_processed'] += len(texts)
+        
         for text in texts:
-            self.validation_stats['total_processed'] += 1
-            
             # Step 1: Clean text (whitespace, encoding, OCR errors)
             cleaned = self.clean_text(text)
             
@@ -329,19 +538,28 @@ class PostProcessor:
             
             processed.append(cleaned)
         
-        # Step 4: Merge broken paragraphs
-        before_merge = len(processed)
-        processed = self.merge_broken_paragraphs(processed)
-        
-        if verbose:
-            print(f"\nPost-processing statistics:")
-            print(f"  Total texts processed: {self.validation_stats['total_processed']}")
-            print(f"  Texts removed: {sum(removed_reasons.values())}")
-            for reason, count in removed_reasons.items():
-                print(f"    - {reason}: {count}")
-            print(f"  Texts after validation: {before_merge}")
-            print(f"  Texts after merging: {len(processed)}")
-            print(f"  Final output: {len(processed)} texts")
-        
-        return processed
+        return processed, removed_reasons
+
+
+def _clean_and_validate_batch(
+    texts: List[str],
+    ocr_fixes: List[tuple],
+    verbose: bool
+) -> Tuple[List[str], Dict[str, int], Dict[str, int]]:
+    """
+    Run steps 1-3 of PostProcessor.process on a batch of texts in a worker process.
+    
+    Args:
+        texts: List of raw extracted text strings
+        ocr_fixes: OCR fix patterns of the calling PostProcessor
+        verbose: Whether to print debugging information
+        
+    Returns:
+        Tuple of (texts that passed validation, validation stats of the batch,
+        counts of removed texts per reason)
+    """
+    processor = PostProcessor()
+    processor.ocr_fixes = ocr_fixes
+    processed, removed_reasons = processor._clean_and_validate(texts, verbose)
+    return processed, processor.validation_stats, removed_reasons
 